@@ -1,8 +1,9 @@
 import mysql.connector
-from smartcard.System import readers
-from datetime import datetime
 import flet as ft
-import asyncio
+from marcaje import ProcesadorMarcajes
+from diario import DiarioMarcajes, EnviadorMarcajes
+from indice_empleados import IndiceEmpleados
+from lector import crear_lector
 
 # Conectar a MySQL
 def connect_db():
@@ -12,100 +13,53 @@ def connect_db():
         password='admin',
         database='nominadb'
     )
-    cursor = conn.cursor()
-    return conn, cursor
+    return conn
 
-# Detectar la lectura de la tarjeta NFC
-def read_nfc():
-    try:
-        r = readers()
-        if len(r) == 0:
-            print("No se detectó ningún lector NFC")
-            return None
-        reader = r[0]
-        connection = reader.createConnection()
-        connection.connect()
-
-        card_data, sw1, sw2 = connection.transmit([0xFF, 0xCA, 0x00, 0x00, 0x00])
-        tarjeta_id = ''.join(format(x, '02X') for x in card_data)
-        return tarjeta_id
-    except Exception as e:
-        print(f"Error al leer la tarjeta: {e}")
-        return None
-
-# Registrar la asistencia y actualizar la interfaz
-def registrar_asistencia(cursor, conn, tarjeta_id, status_label, last_read_time, bloqueado, page):
-    ahora = datetime.now()
-
-    if bloqueado['estado'] and (ahora - last_read_time['time']).total_seconds() < 5:
-        return
-
-    cursor.execute("SELECT id_empleado, nombre, apellido FROM empleados WHERE uid_nfc = %s", (tarjeta_id,))
-    empleado = cursor.fetchone()
-
-    if empleado is None:
-        status_label.value = f"No se encontró ningún empleado con la tarjeta {tarjeta_id}"
-        status_label.color = ft.colors.RED
-        page.update()
-        return
-
-    id_empleado, nombre, apellido = empleado
-
-    cursor.execute("SELECT entrada, salida FROM asistencias WHERE id_empleado = %s ORDER BY entrada DESC LIMIT 1", (id_empleado,))
-    ultima_asistencia = cursor.fetchone()
-
-    ahora_str = ahora.strftime('%Y-%m-%d %H:%M:%S')
-
-    if ultima_asistencia is None or ultima_asistencia[1] is not None:
-        cursor.execute("INSERT INTO asistencias (nombre, entrada, id_empleado) VALUES (%s, %s, %s)", (nombre, ahora_str, id_empleado))
-        conn.commit()
-        status_label.value = f"Bienvenido {nombre} {apellido}"
-        status_label.color = ft.colors.GREEN
-    else:
-        cursor.execute("UPDATE asistencias SET salida = %s WHERE id_empleado = %s AND salida IS NULL", (ahora_str, id_empleado))
-        conn.commit()
-        status_label.value = f"Hasta luego {nombre} {apellido}"
-        status_label.color = ft.colors.BLUE
-
-    last_read_time['time'] = ahora
-    bloqueado['estado'] = True
+# Mostrar el resultado de un marcaje en la interfaz
+def mostrar_resultado(status_label, resultado, vista, page):
+    colores = {'entrada': ft.colors.GREEN, 'salida': ft.colors.BLUE}
+    status_label.value = resultado.mensaje()
+    status_label.color = colores.get(resultado.tipo, ft.colors.RED)
+    page.update()
 
-    page.call_later(5, lambda: [desbloquear(bloqueado), reset_status(status_label, page)])
+    # Volver al mensaje original a los 5 segundos, salvo que haya otro mensaje más reciente
+    vista['mensaje'] += 1
+    mensaje_actual = vista['mensaje']
+    page.call_later(5, lambda: reset_status(status_label, vista, mensaje_actual, page))
 
 # Resetear el mensaje de estado
-def reset_status(status_label, page):
+def reset_status(status_label, vista, mensaje, page):
+    if vista['mensaje'] != mensaje:
+        return
     status_label.value = "Esperando lectura de tarjeta NFC..."
     status_label.color = ft.colors.BLACK
     page.update()
 
-# Desbloquear las lecturas
-def desbloquear(bloqueado):
-    bloqueado['estado'] = False
-
-# Función asíncrona para manejar la lectura periódica de la tarjeta NFC
-async def esperar_tarjeta(cursor, conn, status_label, last_read_time, bloqueado, page):
-    while True:
-        tarjeta_id = read_nfc()
-        if tarjeta_id:
-            registrar_asistencia(cursor, conn, tarjeta_id, status_label, last_read_time, bloqueado, page)
-        await asyncio.sleep(1)  # Espera 1 segundo antes de volver a leer
-
 # Interfaz gráfica en Flet
 def main(page: ft.Page):
     page.title = "Sistema de Registro de Asistencia NFC"
-    conn, cursor = connect_db()
 
     status_label = ft.Text(value="Esperando lectura de tarjeta NFC...", size=24)
 
-    last_read_time = {'time': datetime.now()}
-    bloqueado = {'estado': False}
+    # Los marcajes se resuelven con el índice en memoria, se guardan en el diario local
+    # y un hilo aparte los envía a la base de datos
+    vista = {'mensaje': 0}
+    al_resultado = lambda resultado: mostrar_resultado(status_label, resultado, vista, page)
+    diario = DiarioMarcajes()
+    indice = IndiceEmpleados(connect_db, diario)
+    indice.iniciar()
+    enviador = EnviadorMarcajes(diario, connect_db, indice)
+    enviador.iniciar()
+    procesador = ProcesadorMarcajes(enviador.registrar, al_resultado)
+    procesador.iniciar()
 
-    # Ejecuta la tarea asíncrona para la lectura periódica
     page.add(status_label)
     page.update()
 
-    asyncio.run(esperar_tarjeta(cursor, conn, status_label, last_read_time, bloqueado, page))
+    # El lector avisa cada vez que se acerca una tarjeta y la lectura se encola
+    lector = crear_lector()
+    lector.iniciar(procesador.encolar)
 
 # Ejecutar la aplicación en Flet
 if __name__ == "__main__":
-    ft.app(target=main)
+    ft.app(target=main)
\ No newline at end of file
@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from mysql.connector import Error
+from marcaje import ControlRebote, ResultadoMarcaje
+
+RUTA_DIARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'marcajes_pendientes.db')
+FORMATO_MOMENTO = '%Y-%m-%d %H:%M:%S'
+
+
+class DiarioMarcajes:
+    """
+    Diario local y durable de marcajes (SQLite).
+    Cada marcaje se guarda aquí antes de enviarse a la base de datos, de modo que
+    ninguno se pierde si el servidor no está disponible. También guarda una copia
+    del índice de empleados para poder arrancar sin conexión
+    """
+    def __init__(self, ruta=RUTA_DIARIO):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS marcajes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tarjeta_id TEXT NOT NULL,
+            momento TEXT NOT NULL,
+            id_empleado INTEGER NOT NULL,
+            nombre TEXT NOT NULL,
+            apellido TEXT NOT NULL,
+            tipo TEXT NOT NULL
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS tarjetas (
+            uid TEXT PRIMARY KEY,
+            id_empleado INTEGER NOT NULL,
+            nombre TEXT NOT NULL,
+            apellido TEXT NOT NULL
+        )
+        """)
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS turnos_abiertos (
+            id_empleado INTEGER PRIMARY KEY
+        )
+        """)
+
+    def agregar(self, resultado):
+        """Guardar un marcaje ya resuelto y el nuevo estado del turno del empleado"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                cursor = self._conn.execute(
+                    """INSERT INTO marcajes (tarjeta_id, momento, id_empleado, nombre, apellido, tipo)
+                    VALUES (?, ?, ?, ?, ?, ?)""",
+                    (resultado.tarjeta_id, resultado.momento.strftime(FORMATO_MOMENTO),
+                     resultado.id_empleado, resultado.nombre, resultado.apellido, resultado.tipo))
+                if resultado.tipo == 'entrada':
+                    self._conn.execute(
+                        "INSERT OR IGNORE INTO turnos_abiertos (id_empleado) VALUES (?)",
+                        (resultado.id_empleado,))
+                else:
+                    self._conn.execute(
+                        "DELETE FROM turnos_abiertos WHERE id_empleado = ?",
+                        (resultado.id_empleado,))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.lastrowid
+
+    def pendientes(self, limite=None):
+        """Marcajes pendientes de envío, en el orden en que se hicieron"""
+        with self._lock:
+            filas = self._conn.execute(
+                """SELECT id, tarjeta_id, momento, id_empleado, nombre, apellido, tipo
+                FROM marcajes ORDER BY id LIMIT ?""",
+                (-1 if limite is None else limite,)).fetchall()
+        return [(fila[0], ResultadoMarcaje(fila[6], fila[1], datetime.strptime(fila[2], FORMATO_MOMENTO),
+                                           fila[3], fila[4], fila[5]))
+                for fila in filas]
+
+    def confirmar(self, ids):
+        """Eliminar del diario los marcajes ya registrados en la base de datos"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM marcajes WHERE id = ?", [(i,) for i in ids])
+            self._conn.execute("COMMIT")
+
+    def cantidad(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM marcajes").fetchone()[0]
+
+    def guardar_indice(self, tarjetas, abiertos):
+        """Guardar la copia local del índice de empleados"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM tarjetas")
+            self._conn.executemany(
+                "INSERT INTO tarjetas (uid, id_empleado, nombre, apellido) VALUES (?, ?, ?, ?)",
+                [(uid,) + tuple(empleado) for uid, empleado in tarjetas.items()])
+            self._conn.execute("DELETE FROM turnos_abiertos")
+            self._conn.executemany(
+                "INSERT INTO turnos_abiertos (id_empleado) VALUES (?)",
+                [(id_empleado,) for id_empleado in abiertos])
+            self._conn.execute("COMMIT")
+
+    def cargar_indice(self):
+        """Copia local del índice: (uid -> empleado, empleados con turno abierto)"""
+        with self._lock:
+            tarjetas = {fila[0]: fila[1:] for fila in self._conn.execute(
+                "SELECT uid, id_empleado, nombre, apellido FROM tarjetas")}
+            abiertos = {fila[0] for fila in self._conn.execute(
+                "SELECT id_empleado FROM turnos_abiertos")}
+        return tarjetas, abiertos
+
+
+class EnviadorMarcajes:
+    """
+    Hilo que envía a la base de datos los marcajes del diario por lotes y en orden.
+    Los marcajes ya llegan resueltos (entrada o salida), por lo que el envío solo escribe.
+    Si la conexión falla, reintenta más tarde y reenvía todo lo pendiente
+    """
+    def __init__(self, diario, conectar, indice, lote=200, intervalo=1, espera_maxima=30):
+        self.diario = diario
+        self.conectar = conectar  # conectar() -> conexión de mysql.connector
+        self.indice = indice
+        self.lote = lote
+        self.intervalo = intervalo
+        self.espera_maxima = espera_maxima
+        self.rebote_empleados = ControlRebote()
+        self._conn = None
+        self._aviso = threading.Event()
+        self._hilo = None
+        # Tras un arranque o un error no se sabe si el último lote llegó a la base de datos
+        self._verificar = True
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+
+    def registrar(self, tarjeta_id, momento):
+        """Resolver el marcaje con el índice en memoria y guardarlo en el diario"""
+        empleado = self.indice.buscar(tarjeta_id)
+        if empleado is None:
+            # Puede ser una tarjeta recién asignada: refrescar el índice para la próxima lectura
+            self.indice.invalidar()
+            return ResultadoMarcaje('desconocida', tarjeta_id, momento)
+
+        id_empleado, nombre, apellido = empleado
+        # Un empleado con varias tarjetas tampoco puede marcar dos veces seguidas
+        if not self.rebote_empleados.aceptar(id_empleado, momento):
+            return None
+
+        resultado = self.indice.marcar(tarjeta_id, empleado, momento)
+        self._aviso.set()
+        return resultado
+
+    def _ejecutar(self):
+        espera = self.intervalo
+        while True:
+            self._aviso.wait(espera)
+            self._aviso.clear()
+            try:
+                while self._enviar_lote():
+                    pass
+                espera = self.intervalo
+            except Error as e:
+                # Sin conexión: los marcajes siguen en el diario hasta el próximo intento
+                print(f"Error al enviar marcajes, pendientes: {self.diario.cantidad()} ({e})")
+                self._cerrar_conexion()
+                self._verificar = True
+                espera = min(espera * 2, self.espera_maxima)
+
+    def _conexion(self):
+        if self._conn is None or not self._conn.is_connected():
+            self._conn = self.conectar()
+        return self._conn
+
+    def _cerrar_conexion(self):
+        try:
+            if self._conn is not None:
+                self._conn.close()
+        except Error:
+            pass
+        self._conn = None
+
+    def _enviar_lote(self):
+        """Enviar un lote del diario; devuelve True si pueden quedar más pendientes"""
+        marcajes = self.diario.pendientes(self.lote)
+        if not marcajes:
+            return False
+
+        conn = self._conexion()
+        cursor = conn.cursor()
+        try:
+            self._registrar_lote(cursor, [resultado for _, resultado in marcajes])
+            conn.commit()
+        except Error:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+
+        self.diario.confirmar([id_marcaje for id_marcaje, _ in marcajes])
+        self._verificar = False
+
+        return len(marcajes) == self.lote
+
+    def _ultimos_registros(self, cursor, ids_empleados):
+        """Último registro (entrada, salida) de cada empleado en la base de datos"""
+        marcadores = ', '.join(['%s'] * len(ids_empleados))
+        cursor.execute(f"""
+        SELECT a.id_empleado, a.entrada, a.salida
+        FROM asistencias a
+        JOIN (
+            SELECT id_empleado, MAX(entrada) AS entrada
+            FROM asistencias
+            WHERE id_empleado IN ({marcadores})
+            GROUP BY id_empleado
+        ) u ON u.id_empleado = a.id_empleado AND u.entrada = a.entrada
+        """, ids_empleados)
+        return {id_empleado: (entrada, salida) for id_empleado, entrada, salida in cursor.fetchall()}
+
+    def _registrar_lote(self, cursor, marcajes):
+        """Escribir un lote de marcajes resueltos con dos sentencias en lote"""
+        ultimos = {}
+        if self._verificar:
+            # Recuperación: descartar lo que ya llegó a la base de datos antes del corte
+            ultimos = self._ultimos_registros(cursor, list({m.id_empleado for m in marcajes}))
+
+        salidas = []   # Cierres de turnos abiertos antes del lote
+        entradas = {}  # Turnos nuevos del lote: posición -> [nombre, entrada, salida, id_empleado]
+        abiertos = {}  # id_empleado -> posición del turno abierto dentro del lote
+
+        for posicion, marcaje in enumerate(marcajes):
+            entrada, salida = ultimos.get(marcaje.id_empleado, (None, None))
+            if entrada is not None and marcaje.momento <= max(entrada, salida or entrada):
+                continue
+
+            if marcaje.tipo == 'entrada':
+                entradas[posicion] = [marcaje.nombre, marcaje.momento, None, marcaje.id_empleado]
+                abiertos[marcaje.id_empleado] = posicion
+            elif marcaje.id_empleado in abiertos:
+                # Cierra un turno abierto dentro del mismo lote
+                entradas[abiertos.pop(marcaje.id_empleado)][2] = marcaje.momento
+            else:
+                salidas.append((marcaje.momento, marcaje.id_empleado))
+
+        # Las salidas van primero: solo afectan turnos abiertos antes de este lote
+        if salidas:
+            cursor.executemany(
+                "UPDATE asistencias SET salida = %s WHERE id_empleado = %s AND salida IS NULL",
+                [(momento.strftime(FORMATO_MOMENTO), id_empleado) for momento, id_empleado in salidas])
+        if entradas:
+            cursor.executemany(
+                "INSERT INTO asistencias (nombre, entrada, salida, id_empleado) VALUES (%s, %s, %s, %s)",
+                [(nombre, entrada.strftime(FORMATO_MOMENTO),
+                  salida.strftime(FORMATO_MOMENTO) if salida else None, id_empleado)
+                 for nombre, entrada, salida, id_empleado in
+                 (entradas[posicion] for posicion in sorted(entradas))])
@@ -0,0 +1,121 @@
+import threading
+from mysql.connector import Error
+from marcaje import ResultadoMarcaje
+
+
+class IndiceEmpleados:
+    """
+    Índice en memoria de tarjeta (UID) -> empleado y de los turnos abiertos.
+    Con él cada lectura se resuelve como entrada o salida sin consultar la base de datos.
+    Se refresca periódicamente o al invalidarlo (p. ej. ante una tarjeta desconocida)
+    """
+    def __init__(self, conectar, diario, intervalo=300):
+        self.conectar = conectar  # conectar() -> conexión de mysql.connector
+        self.diario = diario
+        self.intervalo = intervalo
+        self._tarjetas = {}      # uid -> (id_empleado, nombre, apellido)
+        self._abiertos = set()   # empleados con el turno abierto
+        self._durante_refresco = None  # marcajes hechos mientras se lee la base de datos
+        self._lock = threading.Lock()
+        self._aviso = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        """Cargar el índice y refrescarlo en segundo plano"""
+        if not self.refrescar():
+            # Sin conexión: arrancar con la copia local
+            tarjetas, abiertos = self.diario.cargar_indice()
+            with self._lock:
+                self._tarjetas, self._abiertos = tarjetas, abiertos
+            print(f"Índice de empleados cargado desde la copia local ({len(tarjetas)} tarjetas)")
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+
+    def _ejecutar(self):
+        while True:
+            self._aviso.wait(self.intervalo)
+            self._aviso.clear()
+            self.refrescar()
+
+    def invalidar(self):
+        """Pedir un refresco del índice sin esperar al siguiente intervalo"""
+        self._aviso.set()
+
+    def buscar(self, tarjeta_id):
+        with self._lock:
+            return self._tarjetas.get(tarjeta_id)
+
+    def marcar(self, tarjeta_id, empleado, momento):
+        """Alternar el turno del empleado y guardar el marcaje en el diario"""
+        id_empleado, nombre, apellido = empleado
+        with self._lock:
+            tipo = 'salida' if id_empleado in self._abiertos else 'entrada'
+            resultado = ResultadoMarcaje(tipo, tarjeta_id, momento, id_empleado, nombre, apellido)
+            self.diario.agregar(resultado)
+            if self._durante_refresco is not None:
+                self._durante_refresco.append(resultado)
+            if tipo == 'entrada':
+                self._abiertos.add(id_empleado)
+            else:
+                self._abiertos.discard(id_empleado)
+        return resultado
+
+    def refrescar(self):
+        """
+        Recargar tarjetas y turnos abiertos desde la base de datos.
+        Los marcajes pendientes se toman antes de leer la base de datos y se anotan los que
+        se hagan durante la lectura: un lote que el enviador confirme entre medio no se pierde.
+        Aplicados en orden sobre lo leído, el último marcaje de cada empleado decide su turno
+        """
+        with self._lock:
+            pendientes = [marcaje for _, marcaje in self.diario.pendientes()]
+            self._durante_refresco = []
+        try:
+            tarjetas, abiertos = self._leer_base_datos()
+        except Error as e:
+            print(f"No se pudo refrescar el índice de empleados: {e}")
+            with self._lock:
+                self._durante_refresco = None
+            return False
+
+        with self._lock:
+            for marcaje in pendientes + self._durante_refresco:
+                if marcaje.tipo == 'entrada':
+                    abiertos.add(marcaje.id_empleado)
+                else:
+                    abiertos.discard(marcaje.id_empleado)
+            self._durante_refresco = None
+            self._tarjetas, self._abiertos = tarjetas, abiertos
+            self.diario.guardar_indice(tarjetas, abiertos)
+        return True
+
+    def _leer_base_datos(self):
+        """Tarjetas asignadas (uid -> empleado) y empleados con el turno abierto"""
+        conn = self.conectar()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+            SELECT n.uid, e.id_empleado, e.nombre, e.apellido
+            FROM nfc_dispositivos n
+            JOIN empleado_nfc en ON en.id_dispositivo = n.id_dispositivo AND en.activo = 1
+            JOIN empleados e ON e.id_empleado = en.id_empleado
+            WHERE n.estado = 'asignado' AND COALESCE(e.status, 'activo') = 'activo'
+            """)
+            tarjetas = {fila[0]: tuple(fila[1:]) for fila in cursor.fetchall()}
+
+            # Un turno está abierto si el último registro del empleado no tiene salida
+            cursor.execute("""
+            SELECT a.id_empleado
+            FROM asistencias a
+            JOIN (
+                SELECT id_empleado, MAX(entrada) AS entrada
+                FROM asistencias
+                GROUP BY id_empleado
+            ) u ON u.id_empleado = a.id_empleado AND u.entrada = a.entrada
+            WHERE a.salida IS NULL
+            """)
+            abiertos = {fila[0] for fila in cursor.fetchall()}
+            cursor.close()
+            return tarjetas, abiertos
+        finally:
+            conn.close()
@@ -0,0 +1,117 @@
+import os
+import random
+import threading
+
+# APDU para obtener el UID de la tarjeta
+APDU_UID = [0xFF, 0xCA, 0x00, 0x00, 0x00]
+
+
+class LectorPCSC:
+    """
+    Lector NFC basado en eventos (pyscard CardMonitor).
+    Reacciona al insertar una tarjeta en lugar de consultar el lector cada segundo,
+    y reutiliza una conexión por lector
+    """
+    def __init__(self):
+        self._monitor = None
+        self._observador = None
+        self._conexiones = {}  # nombre del lector -> conexión reutilizable
+        self._lock = threading.Lock()
+        self.al_leer = None
+
+    def iniciar(self, al_leer):
+        """Empezar a escuchar inserciones de tarjetas; al_leer(uid) recibe cada lectura"""
+        from smartcard.CardMonitoring import CardMonitor, CardObserver
+
+        lector = self
+
+        class Observador(CardObserver):
+            def update(self, observable, actions):
+                tarjetas_nuevas, _ = actions
+                for tarjeta in tarjetas_nuevas:
+                    lector._leer_tarjeta(tarjeta)
+
+        self.al_leer = al_leer
+        self._observador = Observador()
+        self._monitor = CardMonitor()
+        self._monitor.addObserver(self._observador)
+
+    def detener(self):
+        if self._monitor and self._observador:
+            self._monitor.deleteObserver(self._observador)
+        self._observador = None
+
+    def _conexion(self, nombre_lector):
+        with self._lock:
+            conexion = self._conexiones.get(nombre_lector)
+            if conexion is None:
+                from smartcard.System import readers
+                lectores = {str(r): r for r in readers()}
+                if nombre_lector not in lectores:
+                    raise ValueError(f"No se encontró el lector {nombre_lector}")
+                conexion = lectores[nombre_lector].createConnection()
+                self._conexiones[nombre_lector] = conexion
+            return conexion
+
+    def _leer_tarjeta(self, tarjeta):
+        nombre_lector = str(tarjeta.reader)
+        try:
+            conexion = self._conexion(nombre_lector)
+            conexion.connect()
+            try:
+                card_data, sw1, sw2 = conexion.transmit(APDU_UID)
+            finally:
+                conexion.disconnect()
+            tarjeta_id = ''.join(format(x, '02X') for x in card_data)
+        except Exception as e:
+            print(f"Error al leer la tarjeta: {e}")
+            # Descartar la conexión por si el lector fue desconectado
+            with self._lock:
+                self._conexiones.pop(nombre_lector, None)
+            return
+
+        if tarjeta_id:
+            self.al_leer(tarjeta_id)
+
+
+class LectorSimulado:
+    """
+    Lector de prueba que no necesita hardware.
+    Las lecturas se generan con simular(uid) o, si se indican tarjetas, automáticamente
+    cada 'intervalo' segundos, lo que permite hacer pruebas de carga del terminal
+    """
+    def __init__(self, tarjetas=None, intervalo=1.0):
+        self.tarjetas = list(tarjetas or [])
+        self.intervalo = intervalo
+        self.al_leer = None
+        self.lecturas = 0
+        self._detenido = threading.Event()
+
+    def iniciar(self, al_leer):
+        self.al_leer = al_leer
+        if self.tarjetas:
+            threading.Thread(target=self._generar, daemon=True).start()
+
+    def detener(self):
+        self._detenido.set()
+
+    def simular(self, tarjeta_id):
+        """Simular la lectura de una tarjeta"""
+        self.lecturas += 1
+        self.al_leer(tarjeta_id)
+
+    def _generar(self):
+        while not self._detenido.wait(self.intervalo):
+            self.simular(random.choice(self.tarjetas))
+
+
+def crear_lector():
+    """
+    Lector según la variable de entorno LECTOR_NFC ('pcsc' por defecto o 'simulado').
+    El simulado usa LECTOR_SIMULADO_TARJETAS (UIDs separados por comas)
+    y LECTOR_SIMULADO_INTERVALO (segundos entre lecturas)
+    """
+    if os.environ.get('LECTOR_NFC', 'pcsc') == 'simulado':
+        tarjetas = [uid.strip() for uid in os.environ.get('LECTOR_SIMULADO_TARJETAS', '').split(',') if uid.strip()]
+        return LectorSimulado(tarjetas, float(os.environ.get('LECTOR_SIMULADO_INTERVALO', '1')))
+    return LectorPCSC()
@@ -1,7 +1,10 @@
 import mysql.connector
-from smartcard.System import readers
-from datetime import datetime
 import tkinter as tk
+import queue
+from marcaje import ProcesadorMarcajes
+from diario import DiarioMarcajes, EnviadorMarcajes
+from indice_empleados import IndiceEmpleados
+from lector import crear_lector
 
 # Conectar a MySQL
 def connect_db():
@@ -11,79 +14,25 @@ def connect_db():
         password='admin',
         database='nominadb'
     )
-    cursor = conn.cursor()
-    return conn, cursor
+    return conn
 
-# Detectar la lectura de la tarjeta NFC
-def read_nfc():
-    try:
-        r = readers()
-        if len(r) == 0:
-            print("No se detectó ningún lector NFC")
-            return None
-        reader = r[0]
-        connection = reader.createConnection()
-        connection.connect()
+# Mostrar el resultado de un marcaje en la interfaz
+def mostrar_resultado(label_status, resultado, vista):
+    colores = {'entrada': "green", 'salida': "blue"}
+    label_status.config(text=resultado.mensaje(), fg=colores.get(resultado.tipo, "red"))
 
-        # Leer el ID de la tarjeta (UID)
-        card_data, sw1, sw2 = connection.transmit([0xFF, 0xCA, 0x00, 0x00, 0x00])
-        tarjeta_id = ''.join(format(x, '02X') for x in card_data)
-        return tarjeta_id
-    except Exception as e:
-        print(f"Error al leer la tarjeta: {e}")
-        return None
+    # Después de 5 segundos volver al mensaje original, salvo que haya otro mensaje más reciente
+    vista['mensaje'] += 1
+    mensaje_actual = vista['mensaje']
+    label_status.after(5000, lambda: restablecer_mensaje(label_status, vista, mensaje_actual))
 
-# Registrar la asistencia y actualizar la interfaz
-def registrar_asistencia(cursor, conn, tarjeta_id, label_status, last_read_time, bloqueado):
-    ahora = datetime.now()
-
-    # Bloqueo temporal de 5 segundos después de una lectura
-    if bloqueado['estado'] and (ahora - last_read_time['time']).total_seconds() < 5:
-        return  # Ignorar lectura si está bloqueado
-
-    # Buscar el empleado con este UID de la tarjeta
-    cursor.execute("SELECT id_empleado, nombre, apellido FROM empleados WHERE uid_nfc = %s", (tarjeta_id,))
-    empleado = cursor.fetchone()
-
-    if empleado is None:
-        label_status.config(text=f"No se encontró ningún empleado con la tarjeta {tarjeta_id}", fg="red")
-        return
-
-    id_empleado, nombre, apellido = empleado
-
-    # Buscar la última asistencia del empleado
-    cursor.execute("SELECT entrada, salida FROM asistencias WHERE id_empleado = %s ORDER BY entrada DESC LIMIT 1", (id_empleado,))
-    ultima_asistencia = cursor.fetchone()
-
-    ahora_str = ahora.strftime('%Y-%m-%d %H:%M:%S')
-
-    if ultima_asistencia is None or ultima_asistencia[1] is not None:  # Si no hay asistencia o la última tiene salida
-        # Registrar una nueva entrada
-        cursor.execute("INSERT INTO asistencias (nombre, entrada, id_empleado) VALUES (%s, %s, %s)", (nombre, ahora_str, id_empleado))
-        conn.commit()
-        label_status.config(text=f"Bienvenido {nombre} {apellido}", fg="green")
-    else:
-        # Actualizar la salida en la última asistencia
-        cursor.execute("UPDATE asistencias SET salida = %s WHERE id_empleado = %s AND salida IS NULL", (ahora_str, id_empleado))
-        conn.commit()
-        label_status.config(text=f"Hasta luego {nombre} {apellido}", fg="blue")
-
-    # Actualizar el tiempo de la última lectura y activar el bloqueo
-    last_read_time['time'] = ahora
-    bloqueado['estado'] = True
-
-    # Después de 5 segundos, volver al mensaje original y desactivar el bloqueo
-    label_status.after(5000, lambda: [label_status.config(text="Esperando lectura de tarjeta NFC...", fg="black"),
-                                      desbloquear(bloqueado)])
-
-# Desbloquear las lecturas después del retardo
-def desbloquear(bloqueado):
-    bloqueado['estado'] = False
+# Volver al mensaje de espera
+def restablecer_mensaje(label_status, vista, mensaje):
+    if vista['mensaje'] == mensaje:
+        label_status.config(text="Esperando lectura de tarjeta NFC...", fg="black")
 
 # Función principal para la interfaz gráfica
 def main():
-    conn, cursor = connect_db()
-
     # Crear la ventana de la interfaz
     root = tk.Tk()
     root.title("Sistema de Registro de Asistencia NFC")
@@ -92,19 +41,31 @@ def main():
     label_status = tk.Label(root, text="Esperando lectura de tarjeta NFC...", font=("Arial", 14))
     label_status.pack(pady=50)
 
-    # Variables para gestionar el bloqueo temporal
-    last_read_time = {'time': datetime.now()}
-    bloqueado = {'estado': False}
-
-    # Función que actualiza la interfaz y espera la tarjeta
-    def esperar_tarjeta():
-        tarjeta_id = read_nfc()
-        if tarjeta_id:
-            registrar_asistencia(cursor, conn, tarjeta_id, label_status, last_read_time, bloqueado)
-        root.after(1000, esperar_tarjeta)  # Repetir cada segundo
-
-    root.after(1000, esperar_tarjeta)
+    # Los marcajes se resuelven con el índice en memoria, se guardan en el diario local
+    # y un hilo aparte los envía a la base de datos; sus resultados vuelven por esta cola
+    resultados = queue.Queue()
+    vista = {'mensaje': 0}
+    diario = DiarioMarcajes()
+    indice = IndiceEmpleados(connect_db, diario)
+    indice.iniciar()
+    enviador = EnviadorMarcajes(diario, connect_db, indice)
+    enviador.iniciar()
+    procesador = ProcesadorMarcajes(enviador.registrar, resultados.put)
+    procesador.iniciar()
+
+    # El lector avisa cada vez que se acerca una tarjeta y la lectura se encola
+    lector = crear_lector()
+    lector.iniciar(procesador.encolar)
+
+    # Tkinter solo puede actualizarse desde el hilo principal
+    def mostrar_resultados():
+        while not resultados.empty():
+            mostrar_resultado(label_status, resultados.get(), vista)
+        root.after(100, mostrar_resultados)
+
+    root.after(100, mostrar_resultados)
     root.mainloop()
+    lector.detener()
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
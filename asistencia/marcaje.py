@@ -0,0 +1,93 @@
+import queue
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+
+# Segundos durante los que se ignoran lecturas repetidas de la misma tarjeta o empleado
+REBOTE_SEGUNDOS = 5
+
+
+@dataclass
+class ResultadoMarcaje:
+    """Resultado de procesar una lectura de tarjeta"""
+    tipo: str  # 'entrada', 'salida', 'desconocida' o 'error'
+    tarjeta_id: str
+    momento: datetime
+    id_empleado: int = None
+    nombre: str = ''
+    apellido: str = ''
+
+    def mensaje(self):
+        """Texto a mostrar en la pantalla del terminal"""
+        if self.tipo == 'entrada':
+            return f"Bienvenido {self.nombre} {self.apellido}"
+        if self.tipo == 'salida':
+            return f"Hasta luego {self.nombre} {self.apellido}"
+        if self.tipo == 'desconocida':
+            return f"No se encontró ningún empleado con la tarjeta {self.tarjeta_id}"
+        return "No se pudo registrar la asistencia, intente de nuevo"
+
+
+class ControlRebote:
+    """Ignora lecturas repetidas de una misma clave (tarjeta o empleado) dentro de la ventana"""
+    def __init__(self, ventana=REBOTE_SEGUNDOS):
+        self.ventana = ventana
+        self._ultimas = {}  # clave -> instante de la última lectura aceptada
+        self._lock = threading.Lock()
+
+    def aceptar(self, clave, momento):
+        """Devuelve True si la lectura debe procesarse y la registra"""
+        with self._lock:
+            ultima = self._ultimas.get(clave)
+            if ultima is not None and (momento - ultima).total_seconds() < self.ventana:
+                return False
+            self._ultimas[clave] = momento
+            if len(self._ultimas) > 1000:
+                self._purgar(momento)
+            return True
+
+    def _purgar(self, momento):
+        self._ultimas = {clave: ultima for clave, ultima in self._ultimas.items()
+                         if (momento - ultima).total_seconds() < self.ventana}
+
+
+class ProcesadorMarcajes:
+    """
+    Cola interna de lecturas de tarjetas.
+    El lector solo encola la lectura y un hilo aparte la registra, por lo que
+    la lectura nunca espera a la base de datos ni a la interfaz
+    """
+    def __init__(self, registrar, al_resultado, ventana=REBOTE_SEGUNDOS):
+        self.registrar = registrar          # registrar(tarjeta_id, momento) -> ResultadoMarcaje
+        self.al_resultado = al_resultado    # al_resultado(ResultadoMarcaje)
+        self.rebote_tarjetas = ControlRebote(ventana)
+        self._cola = queue.Queue()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._procesar, daemon=True)
+        self._hilo.start()
+
+    def encolar(self, tarjeta_id):
+        """Encolar una lectura; devuelve False si es un rebote de la misma tarjeta"""
+        # La hora del marcaje es la de la lectura, no la del registro
+        momento = datetime.now()
+        if not self.rebote_tarjetas.aceptar(tarjeta_id, momento):
+            return False
+        self._cola.put((tarjeta_id, momento))
+        return True
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def _procesar(self):
+        while True:
+            tarjeta_id, momento = self._cola.get()
+            try:
+                resultado = self.registrar(tarjeta_id, momento)
+            except Exception as e:
+                print(f"Error al registrar la asistencia de la tarjeta {tarjeta_id}: {e}")
+                resultado = ResultadoMarcaje('error', tarjeta_id, momento)
+
+            if resultado is not None:
+                self.al_resultado(resultado)
@@ -0,0 +1,99 @@
+import sys
+import time
+from datetime import date, timedelta
+import mysql.connector
+from util.config import DB_CONFIG
+
+# Comparación de las consultas de asistencias antes y después de la migración 004
+# (columna asistencias.fecha con el índice (id_empleado, fecha, entrada)).
+# Se ejecuta desde la carpeta nomina, con la migración aplicada:
+#   python benchmark_asistencias.py [fecha_inicio fecha_fin [id_empleado]]
+
+REPETICIONES = 5
+
+CALENDARIO = """
+WITH RECURSIVE calendario AS (
+    SELECT CAST(%(inicio)s AS DATE) AS fecha
+    UNION ALL
+    SELECT DATE_ADD(fecha, INTERVAL 1 DAY) FROM calendario WHERE fecha < %(fin)s
+),
+dias_laborables AS (
+    SELECT fecha FROM calendario WHERE DAYOFWEEK(fecha) NOT IN (1, 7)
+)
+"""
+
+# (nombre, consulta anterior, consulta actual); la condición sobre la asistencia es lo único que cambia
+CONSULTAS = [
+    ('Asistencias del período (todos los empleados)',
+     CALENDARIO + """
+     SELECT COUNT(*), COUNT(a.id)
+     FROM dias_laborables dl
+     CROSS JOIN empleados e
+     LEFT JOIN asistencias a ON {condicion}
+     """,
+     {'antes': "DATE(a.entrada) = dl.fecha AND a.id_empleado = e.id_empleado",
+      'despues': "a.id_empleado = e.id_empleado AND a.fecha = dl.fecha"}),
+    ('Inasistencias de un empleado',
+     CALENDARIO + """
+     SELECT COUNT(*)
+     FROM dias_laborables dl
+     LEFT JOIN asistencias a ON {condicion}
+     WHERE a.id IS NULL
+     """,
+     {'antes': "DATE(a.entrada) = dl.fecha AND a.id_empleado = %(empleado)s",
+      'despues': "a.id_empleado = %(empleado)s AND a.fecha = dl.fecha"}),
+    ('Asistencia de un empleado en un día (justificación)',
+     """
+     SELECT id FROM asistencias WHERE {condicion}
+     """,
+     {'antes': "id_empleado = %(empleado)s AND DATE(entrada) = %(fin)s",
+      'despues': "id_empleado = %(empleado)s AND fecha = %(fin)s"}),
+]
+
+
+def medir(cursor, query, params):
+    """Mejor tiempo de REPETICIONES ejecuciones, en milisegundos"""
+    mejor = None
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        cursor.execute(query, params)
+        cursor.fetchall()
+        duracion = (time.perf_counter() - inicio) * 1000
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor
+
+
+def explicar(cursor, query, params):
+    cursor.execute("EXPLAIN FORMAT=TREE " + query, params)
+    return cursor.fetchone()[0]
+
+
+if __name__ == "__main__":
+    fin = sys.argv[2] if len(sys.argv) > 2 else date.today().isoformat()
+    inicio = sys.argv[1] if len(sys.argv) > 1 else (date.today() - timedelta(days=30)).isoformat()
+
+    conexion = mysql.connector.connect(**DB_CONFIG)
+    cursor = conexion.cursor()
+    if len(sys.argv) > 3:
+        empleado = int(sys.argv[3])
+    else:
+        cursor.execute("SELECT id_empleado FROM asistencias GROUP BY id_empleado ORDER BY COUNT(*) DESC LIMIT 1")
+        fila = cursor.fetchone()
+        empleado = fila[0] if fila else 0
+    cursor.execute("SELECT COUNT(*) FROM asistencias")
+    print(f"Asistencias: {cursor.fetchone()[0]:,}  Período: {inicio} a {fin}  Empleado: {empleado}")
+
+    params = {'inicio': inicio, 'fin': fin, 'empleado': empleado}
+    for nombre, plantilla, condiciones in CONSULTAS:
+        print(f"\n=== {nombre} ===")
+        tiempos = {}
+        for version, condicion in condiciones.items():
+            query = plantilla.format(condicion=condicion)
+            print(f"\n--- {version}: {condicion}")
+            print(explicar(cursor, query, params))
+            tiempos[version] = medir(cursor, query, params)
+        mejora = tiempos['antes'] / tiempos['despues'] if tiempos['despues'] else 0
+        print(f"\nAntes: {tiempos['antes']:.2f} ms  Después: {tiempos['despues']:.2f} ms  ({mejora:.1f}x)")
+
+    cursor.close()
+    conexion.close()
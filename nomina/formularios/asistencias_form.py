@@ -275,9 +275,10 @@ class AsistenciasForm(ttk.Frame):
                 
                 estado_actual = registro[5]
                 observacion = registro[6]
+                medio_dia = bool(registro[7])
                 
                 # Calcular estado y horas trabajadas
-                estado, horas, obs = self.calcular_estado_asistencia(entrada, salida, estado_actual)
+                estado, horas, obs = self.calcular_estado_asistencia(entrada, salida, estado_actual, medio_dia)
                 
                 # Si hay una observación previa, mantenerla
                 if observacion:
@@ -324,10 +325,11 @@ class AsistenciasForm(ttk.Frame):
             return f"{horas:02d}:{minutos:02d}"
         return None
 
-    def calcular_estado_asistencia(self, entrada, salida, estado_actual=None):
+    def calcular_estado_asistencia(self, entrada, salida, estado_actual=None, medio_dia=False):
         """
         Calcula el estado de la asistencia basado en las horas trabajadas y los horarios.
-        Si trabaja menos de 4 horas se considera inasistencia.
+        Si trabaja menos de 4 horas (2 en los días de medio día) se considera inasistencia,
+        igual que en el cálculo de inasistencias de la nómina.
         """
         if estado_actual == 'Justificada':
             return 'Justificada', 8.0, "Asistencia justificada"
@@ -367,8 +369,8 @@ class AsistenciasForm(ttk.Frame):
             
         horas_trabajadas = (salida_dt - entrada_dt).total_seconds() / 3600
         
-        # Si trabajó menos de 4 horas, se considera inasistencia
-        if horas_trabajadas < 4:
+        # Si trabajó menos de 4 horas (2 en un día de medio día), se considera inasistencia
+        if horas_trabajadas < (2 if medio_dia else 4):
             return 'Ausente', 0.0, f"Trabajó menos de media jornada ({horas_trabajadas:.1f} hrs)"
             
         # Verificar retardo
@@ -378,7 +380,8 @@ class AsistenciasForm(ttk.Frame):
             return 'Retardo', horas_trabajadas, f"Retardo de {int(minutos_retardo)} minutos"
             
         # Verificar horas mínimas
-        if horas_trabajadas < self.HORAS_LABORALES:
+        jornada = self.HORAS_LABORALES / 2 if medio_dia else self.HORAS_LABORALES
+        if horas_trabajadas < jornada:
             return 'Incompleto', horas_trabajadas, f"Jornada incompleta ({horas_trabajadas:.1f} hrs)"
             
         return 'Presente', horas_trabajadas, "Asistencia completa"
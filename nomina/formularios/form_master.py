@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk, Menu, messagebox
 from PIL import Image, ImageTk
 from util.db_manager import DatabaseManager
-from util.config import DB_CONFIG
+from util.config import DB_CONFIG, INTERVALO_NOTIFICACIONES
 from util.notification_manager import NotificationManager
 from datetime import datetime
 from ttkthemes import ThemedStyle
@@ -11,6 +11,8 @@ class NotificationPopup(tk.Toplevel):
     def __init__(self, parent, notificaciones, notification_manager):
         super().__init__(parent)
         self.notification_manager = notification_manager
+        self.notificaciones = notificaciones
+        self.botones_leida = {}  # id_notificacion -> botón de marcar como leída
         
         # Configuración de la ventana
         self.title("Notificaciones")
@@ -25,12 +27,14 @@ class NotificationPopup(tk.Toplevel):
         header_frame = ttk.Frame(main_frame)
         header_frame.pack(fill=tk.X, pady=(0, 10))
         
-        ttk.Label(header_frame, text=f"Notificaciones ({len(notificaciones)})", 
-                 font=('Helvetica', 12, 'bold')).pack(side=tk.LEFT)
+        self.titulo_label = ttk.Label(header_frame, text=f"Notificaciones ({len(notificaciones)})", 
+                 font=('Helvetica', 12, 'bold'))
+        self.titulo_label.pack(side=tk.LEFT)
         
+        self.boton_todas = ttk.Button(header_frame, text="Marcar todas como leídas",
+                      command=self.marcar_todas_leidas)
         if notificaciones:
-            ttk.Button(header_frame, text="Marcar todas como leídas",
-                      command=self.marcar_todas_leidas).pack(side=tk.RIGHT)
+            self.boton_todas.pack(side=tk.RIGHT)
         
         # Frame para la lista de notificaciones con scroll
         list_frame = ttk.Frame(main_frame)
@@ -80,19 +84,37 @@ class NotificationPopup(tk.Toplevel):
         self.canvas.yview_scroll(int(-1 * (event.delta/120)), "units")
         
     def mostrar_notificaciones(self, notificaciones):
-        if not notificaciones:
-            ttk.Label(self.notification_frame, 
+        self.sin_notificaciones_label = ttk.Label(self.notification_frame, 
                      text="No hay notificaciones nuevas",
-                     font=('Helvetica', 10)).pack(pady=20)
+                     font=('Helvetica', 10))
+        if not notificaciones:
+            self.sin_notificaciones_label.pack(pady=20)
             return
             
         for notif in notificaciones:
             self.crear_notificacion_widget(notif)
+
+    def agregar_notificaciones(self, nuevas):
+        """Agregar al principio de la lista las notificaciones llegadas con la ventana abierta"""
+        if not nuevas:
+            return
+        self.sin_notificaciones_label.pack_forget()
+        self.boton_todas.pack(side=tk.RIGHT)
+        
+        # Llegan de la más antigua a la más nueva; cada una se pone encima de la anterior
+        for notif in nuevas:
+            self.crear_notificacion_widget(notif, al_inicio=True)
+        self.titulo_label.config(text=f"Notificaciones ({len(self.notificaciones)})")
             
-    def crear_notificacion_widget(self, notif):
+    def crear_notificacion_widget(self, notif, al_inicio=False):
+        # Las notificaciones nuevas se insertan antes de la primera de la lista
+        posicion = {}
+        if al_inicio and self.notification_frame.pack_slaves():
+            posicion = {'before': self.notification_frame.pack_slaves()[0]}
+        
         # Frame para cada notificación
         notif_frame = ttk.Frame(self.notification_frame)
-        notif_frame.pack(fill=tk.X, pady=5, padx=5)
+        notif_frame.pack(fill=tk.X, pady=5, padx=5, **posicion)
         
         # Contenido de la notificación
         content_frame = ttk.Frame(notif_frame)
@@ -120,29 +142,40 @@ class NotificationPopup(tk.Toplevel):
         
         # Separador
         ttk.Separator(self.notification_frame, 
-                     orient='horizontal').pack(fill=tk.X, pady=5)
+                     orient='horizontal').pack(fill=tk.X, pady=5, **posicion)
         
         # Si no está leída, añadir botón de marcar como leída
         if notif['estado'] == 'no_leida':
-            ttk.Button(notif_frame,
+            boton = ttk.Button(notif_frame,
                       text="✓",
                       width=3,
-                      command=lambda: self.marcar_leida(notif['id_notificacion']),
-                      ).pack(side=tk.RIGHT, padx=5)
+                      command=lambda: self.marcar_leida(notif),
+                      )
+            boton.pack(side=tk.RIGHT, padx=5)
+            self.botones_leida[notif['id_notificacion']] = boton
             
-    def marcar_leida(self, id_notificacion):
+    def marcar_leida(self, notif):
         """Marcar una notificación específica como leída"""
-        if self.notification_manager.marcar_como_leida(id_notificacion):
-            # Actualizar la interfaz
-            self.master.verificar_notificaciones()
-            self.destroy()
+        if self.notification_manager.marcar_como_leida(notif['id_notificacion']):
+            # Actualizar la interfaz sin volver a cargar la lista
+            notif['estado'] = 'leida'
+            self.botones_leida.pop(notif['id_notificacion']).pack_forget()
+            self.master.actualizar_contador_notificaciones()
             
     def marcar_todas_leidas(self):
         """Marcar todas las notificaciones como leídas"""
         if self.notification_manager.marcar_todas_como_leidas(
                 self.master.user_data['id_usuario']):
-            self.master.verificar_notificaciones()
-            self.destroy()
+            for notif in self.notificaciones:
+                notif['estado'] = 'leida'
+            for boton in self.botones_leida.values():
+                boton.pack_forget()
+            self.botones_leida.clear()
+            self.master.actualizar_contador_notificaciones()
+
+    def destroy(self):
+        self.master.popup_notificaciones = None
+        super().destroy()
             
     def center_window(self):
         """Centrar la ventana en la pantalla"""
@@ -235,6 +268,12 @@ class MainApp(tk.Tk):
         
         # Inicializar NotificationManager
         self.notification_manager = NotificationManager(self.db_manager)
+        
+        # Notificaciones ya cargadas (de la más nueva a la más antigua) y id de la última;
+        # solo se piden a la base de datos las que tengan un id mayor
+        self.notificaciones = []
+        self.ultima_notificacion = 0
+        self.popup_notificaciones = None
                 
         # Cargar icono de campana
         try:
@@ -269,11 +308,8 @@ class MainApp(tk.Tk):
             borderwidth=0
         )
         
-        # Iniciar verificación de notificaciones
+        # Iniciar verificación periódica de notificaciones
         self.verificar_notificaciones()
-        
-        # Programar verificación periódica
-        self.after(300000, self.verificar_notificaciones)  # Cada 5 minutos
 
         # Labels para fecha y hora
         self.date_label = ttk.Label(self.user_info_frame, style='Time.TLabel')
@@ -551,45 +587,59 @@ class MainApp(tk.Tk):
             }
         
     def verificar_notificaciones(self):
-            """Verificar y actualizar el contador de notificaciones"""
-            if not hasattr(self, 'user_data') or 'id_usuario' not in self.user_data:
-                return
-                
-            # Verificar y crear nuevas notificaciones
-            self.notification_manager.verificar_y_crear_notificaciones(
-                self.user_data['id_usuario']
-            )
-            
-            # Contar notificaciones no leídas
-            count = self.notification_manager.contar_notificaciones_no_leidas(
-                self.user_data['id_usuario']
-            )
-            
-            # Actualizar contador visual
-            if count > 0:
-                self.notification_count.config(text=str(count))
-                self.notification_count.pack(side=tk.RIGHT)
-            else:
-                self.notification_count.pack_forget()
-            
-            # Programar siguiente verificación
-            if not hasattr(self, 'after_ids'):
-                self.after_ids = []
-            after_id = self.after(300000, self.verificar_notificaciones)  # 5 minutos
-            self.after_ids.append(after_id)
+        """Actualizar el contador de notificaciones y programar la siguiente verificación"""
+        # Las notificaciones las genera el programador central (programador_notificaciones.py);
+        # el cliente solo consulta cuántas tiene sin leer
+        self.actualizar_contador_notificaciones()
+
+        # Programar siguiente verificación
+        if not hasattr(self, 'after_ids'):
+            self.after_ids = []
+        after_id = self.after(INTERVALO_NOTIFICACIONES, self.verificar_notificaciones)
+        self.after_ids.append(after_id)
+
+    def actualizar_contador_notificaciones(self):
+        """Actualizar el contador de notificaciones no leídas"""
+        if not hasattr(self, 'user_data') or 'id_usuario' not in self.user_data:
+            return
+
+        # Contador de no leídas e id de la última notificación del usuario
+        estado = self.notification_manager.obtener_estado_notificaciones(
+            self.user_data['id_usuario']
+        )
+        count = estado['no_leidas']
+
+        # Actualizar contador visual
+        if count > 0:
+            self.notification_count.config(text=str(count))
+            self.notification_count.pack(side=tk.RIGHT)
+        else:
+            self.notification_count.pack_forget()
+
+        # Con la ventana de notificaciones abierta, agregar las que hayan llegado
+        if self.popup_notificaciones and estado['ultima_id'] > self.ultima_notificacion:
+            self.popup_notificaciones.agregar_notificaciones(self.cargar_notificaciones_nuevas())
+
+    def cargar_notificaciones_nuevas(self):
+        """Traer solo las notificaciones posteriores a la última cargada y agregarlas a la lista"""
+        nuevas = self.notification_manager.obtener_notificaciones_nuevas(
+            self.user_data['id_usuario'], self.ultima_notificacion
+        )
+        if nuevas:
+            self.ultima_notificacion = nuevas[-1]['id_notificacion']
+            self.notificaciones[:0] = reversed(nuevas)
+        return nuevas
         
     def mostrar_notificaciones(self):
         """Mostrar ventana de notificaciones"""
         if not hasattr(self, 'user_data') or 'id_usuario' not in self.user_data:
             return
             
-        # Obtener notificaciones
-        notificaciones = self.notification_manager.obtener_notificaciones_usuario(
-            self.user_data['id_usuario']
-        )
+        # Obtener las notificaciones que aún no se habían cargado
+        self.cargar_notificaciones_nuevas()
         
         # Mostrar ventana de notificaciones
-        NotificationPopup(self, notificaciones, self.notification_manager)
+        self.popup_notificaciones = NotificationPopup(self, self.notificaciones, self.notification_manager)
 
     def update_user_info(self):
         """Actualiza la información mostrada del usuario"""
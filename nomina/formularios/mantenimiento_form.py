@@ -1,13 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkcalendar import DateEntry
-import subprocess
 import os
+import queue
+import re
+import time
 from datetime import datetime
 import shutil
-from util.config import DB_CONFIG
+from util.config import DB_CONFIG, RESPALDOS_CONFIG
+from util.respaldos import GestorRespaldos, TareaRespaldo
 from util.ayuda import Ayuda
 
+# Milisegundos sin escribir antes de lanzar la búsqueda en la auditoría
+ESPERA_BUSQUEDA = 300
+# Resultados máximos de una búsqueda en la auditoría (los más relevantes)
+MAXIMO_RESULTADOS_BUSQUEDA = 500
+
 class MantenimientoForm(ttk.Frame):
     def __init__(self, parent, db_manager, usuario_actual):
         super().__init__(parent)
@@ -31,9 +39,8 @@ class MantenimientoForm(ttk.Frame):
             return
         
         # Crear directorio de respaldos si no existe
-        self.backup_dir = "backups"
-        if not os.path.exists(self.backup_dir):
-            os.makedirs(self.backup_dir)
+        self.gestor_respaldos = GestorRespaldos(DB_CONFIG, **RESPALDOS_CONFIG)
+        self.backup_dir = self.gestor_respaldos.directorio
 
         # Frame principal
         self.main_frame = ttk.Frame(self, padding="10")
@@ -66,10 +73,23 @@ class MantenimientoForm(ttk.Frame):
         action_frame = ttk.Frame(self.backup_frame)
         action_frame.pack(fill=tk.X, pady=10)
         
-        ttk.Button(action_frame, text="Crear Respaldo",
-                  command=self.create_backup).pack(side=tk.LEFT, padx=5)
-        ttk.Button(action_frame, text="Restaurar Respaldo",
-                  command=self.restore_backup).pack(side=tk.LEFT, padx=5)
+        self.botones_respaldo = [
+            ttk.Button(action_frame, text="Crear Respaldo",
+                      command=self.create_backup)
+        ]
+        # Los respaldos incrementales solo existen con el motor paralelo
+        if self.gestor_respaldos.motor != 'mysqldump':
+            self.botones_respaldo.append(
+                ttk.Button(action_frame, text="Respaldo Incremental",
+                          command=lambda: self.create_backup(incremental=True)))
+        self.botones_respaldo += [
+            ttk.Button(action_frame, text="Restaurar Respaldo",
+                      command=self.restore_backup),
+            ttk.Button(action_frame, text="Verificar Respaldo",
+                      command=self.verify_backup)
+        ]
+        for boton in self.botones_respaldo:
+            boton.pack(side=tk.LEFT, padx=5)
         
         # Frame para lista de respaldos
         list_frame = ttk.LabelFrame(self.backup_frame, text="Respaldos Disponibles")
@@ -77,17 +97,23 @@ class MantenimientoForm(ttk.Frame):
         
         # Crear Treeview
         self.backup_tree = ttk.Treeview(list_frame, columns=(
-            "fecha", "tamaño", "ruta"
+            "fecha", "tamaño", "ruta", "tipo", "filas", "duracion"
         ), show='headings')
         
         # Configurar columnas
         self.backup_tree.heading("fecha", text="Fecha")
         self.backup_tree.heading("tamaño", text="Tamaño")
         self.backup_tree.heading("ruta", text="Ubicación")
+        self.backup_tree.heading("tipo", text="Tipo")
+        self.backup_tree.heading("filas", text="Filas")
+        self.backup_tree.heading("duracion", text="Duración")
         
         self.backup_tree.column("fecha", width=150)
         self.backup_tree.column("tamaño", width=100)
         self.backup_tree.column("ruta", width=300)
+        self.backup_tree.column("tipo", width=100)
+        self.backup_tree.column("filas", width=100)
+        self.backup_tree.column("duracion", width=80)
         
         # Scrollbars
         scrolly = ttk.Scrollbar(list_frame, orient=tk.VERTICAL,
@@ -217,6 +243,11 @@ class MantenimientoForm(ttk.Frame):
         self.pagina_actual = 1
         self.total_registros = 0
         self.total_paginas = 1
+        # Claves (fecha, id_log) del primer y último registro de la página mostrada
+        self.primera_clave = None
+        self.ultima_clave = None
+        self.hay_anterior = False
+        self.hay_siguiente = False
 
         self.cargar_logs()
 
@@ -233,48 +264,56 @@ class MantenimientoForm(ttk.Frame):
         DetalleAuditoriaWindow(self, valores)
 
     def filtrar_registros(self, *args):
-        """Filtrar registros de auditoría según texto de búsqueda y fechas"""
+        """Programar la búsqueda para cuando se deje de escribir, en lugar de una por tecla"""
+        if getattr(self, 'busqueda_pendiente', None):
+            self.after_cancel(self.busqueda_pendiente)
+        self.busqueda_pendiente = self.after(ESPERA_BUSQUEDA, self.buscar_registros)
+
+    def buscar_registros(self):
+        """
+        Filtrar registros de auditoría según texto de búsqueda y fechas.
+        El texto se busca con el índice FULLTEXT de usuario, acción, tabla y detalle
+        (migración 003) y los resultados se ordenan por relevancia
+        """
+        self.busqueda_pendiente = None
         try:
             # Obtener fechas y texto de búsqueda
             fecha_inicio = self.fecha_inicio.get_date()
             fecha_fin = self.fecha_fin.get_date()
-            texto = self.search_var.get().lower()
+            # Cada palabra es obligatoria y puede estar incompleta (búsqueda mientras se escribe)
+            palabras = re.findall(r'\w+', self.search_var.get())
+            busqueda = ' '.join(f"+{palabra}*" for palabra in palabras)
             
             # Construir query base
             query = """
             SELECT DATE_FORMAT(a.fecha, '%d-%m-%Y %H:%i') as fecha, 
-                a.usuario, a.accion, a.tabla, a.detalle
+                a.usuario, 
+                COALESCE(a.rol, 'No especificado') as rol,
+                a.accion, 
+                a.tabla, 
+                a.detalle
             FROM auditoria a
-            WHERE a.fecha BETWEEN %s AND DATE_ADD(%s, INTERVAL 1 DAY)
+            WHERE a.fecha >= %s AND a.fecha < DATE_ADD(%s, INTERVAL 1 DAY)
             """
             params = [fecha_inicio, fecha_fin]
             
             # Agregar filtro de búsqueda si hay texto
-            if texto:
+            if busqueda:
                 query += """ 
-                AND (
-                    LOWER(a.usuario) LIKE %s OR
-                    LOWER(a.accion) LIKE %s OR
-                    LOWER(a.tabla) LIKE %s OR
-                    LOWER(a.detalle) LIKE %s
-                )
+                AND MATCH(a.usuario, a.accion, a.tabla, a.detalle) AGAINST (%s IN BOOLEAN MODE)
+                ORDER BY MATCH(a.usuario, a.accion, a.tabla, a.detalle) AGAINST (%s IN BOOLEAN MODE) DESC,
+                    a.fecha DESC
                 """
-                params.extend([f"%{texto}%"] * 4)  # Agregar el parámetro 4 veces para cada campo
+                params.extend([busqueda, busqueda])
+            else:
+                query += " ORDER BY a.fecha DESC, a.id_log DESC"
             
-            # Ordenar por fecha descendente
-            query += " ORDER BY a.fecha DESC"
+            query += " LIMIT %s"
+            params.append(MAXIMO_RESULTADOS_BUSQUEDA)
             
             # Ejecutar consulta
             registros = self.db_manager.ejecutar_query(query, params)
-            
-            # Limpiar y actualizar Treeview
-            for item in self.audit_tree.get_children():
-                self.audit_tree.delete(item)
-                
-            for registro in registros:
-                valores = list(registro)
-                valores[4] = self.formatear_detalle(valores[4])
-                self.audit_tree.insert('', 'end', values=valores)
+            self.actualizar_treeview(registros)
                 
         except Exception as e:
             print(f"Error al filtrar registros: {str(e)}")
@@ -295,122 +334,281 @@ class MantenimientoForm(ttk.Frame):
             
         return primera_linea
 
-    def create_backup(self):
-        try:
-            mysqldump_path = "C:/Program Files/MySQL/MySQL Server 8.3/bin/mysqldump"
-            command = [
-                mysqldump_path,
-                f'--host={DB_CONFIG["host"]}',
-                f'--user={DB_CONFIG["user"]}',
-                f'--password={DB_CONFIG["password"]}',
-                DB_CONFIG["database"]
-            ]
-            
-            timestamp = datetime.now().strftime('%d%m%Y_%H%M%S')
-            filename = f"backup_{timestamp}.sql"
-            backup_path = os.path.join(self.backup_dir, filename)
-            
-            with open(backup_path, 'w') as f:
-                subprocess.run(command, stdout=f, check=True)
-                
-            messagebox.showinfo("Éxito", "Respaldo creado correctamente")
-            self.cargar_respaldos()
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al crear respaldo: {str(e)}")
+    def create_backup(self, incremental=False):
+        tarea = TareaRespaldo(self.gestor_respaldos.crear_respaldo, incremental)
+
+        def al_terminar(evento):
+            if evento[0] == 'fin':
+                respaldo = evento[1]
+                messagebox.showinfo("Éxito", f"Respaldo creado correctamente\n"
+                                    f"{respaldo['archivo']} ({self.formatear_tamaño(respaldo['tamaño'])})")
+                if self.winfo_exists():
+                    self.cargar_respaldos()
+            elif evento[0] == 'cancelado':
+                messagebox.showinfo("Respaldo", "Respaldo cancelado")
+            else:
+                messagebox.showerror("Error", f"Error al crear respaldo: {evento[1]}")
+
+        self.ejecutar_tarea_respaldo("Creando respaldo", tarea, al_terminar)
 
     def restore_backup(self):
-        try:
-            selected = self.backup_tree.selection()
-            if not selected:
-                messagebox.showwarning("Advertencia", "Por favor seleccione un respaldo")
-                return
-                
-            if messagebox.askyesno("Confirmar", "¿Está seguro de restaurar este respaldo? Esto sobrescribirá todos los datos actuales."):
-                backup_path = self.backup_tree.item(selected[0])['values'][2]
-                mysql_path = "C:/Program Files/MySQL/MySQL Server 8.3/bin/mysql"
-                
-                command = [
-                    mysql_path,
-                    f'--host={DB_CONFIG["host"]}',
-                    f'--user={DB_CONFIG["user"]}',
-                    f'--password={DB_CONFIG["password"]}',
-                    DB_CONFIG["database"]
-                ]
-                
-                with open(backup_path, 'r') as f:
-                    subprocess.run(command, stdin=f, check=True)
-                
-                messagebox.showinfo("Éxito", "Base de datos restaurada correctamente")
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al restaurar: {str(e)}")
+        selected = self.backup_tree.selection()
+        if not selected:
+            messagebox.showwarning("Advertencia", "Por favor seleccione un respaldo")
+            return
+            
+        if messagebox.askyesno("Confirmar", "¿Está seguro de restaurar este respaldo? Esto sobrescribirá todos los datos actuales."):
+            backup_path = self.backup_tree.item(selected[0])['values'][2]
+            tarea = TareaRespaldo(self.gestor_respaldos.restaurar_respaldo, backup_path)
+
+            def al_terminar(evento):
+                if evento[0] == 'fin':
+                    messagebox.showinfo("Éxito", "Base de datos restaurada correctamente")
+                elif evento[0] == 'cancelado':
+                    messagebox.showwarning("Restauración cancelada",
+                                           "La restauración se canceló antes de terminar: la base de datos "
+                                           "puede haber quedado incompleta. Restaure nuevamente un respaldo.")
+                else:
+                    messagebox.showerror("Error", f"Error al restaurar: {evento[1]}")
+
+            self.ejecutar_tarea_respaldo("Restaurando respaldo", tarea, al_terminar)
+
+    def verify_backup(self):
+        """Restaurar el respaldo seleccionado en un esquema temporal y comparar su contenido"""
+        selected = self.backup_tree.selection()
+        if not selected:
+            messagebox.showwarning("Advertencia", "Por favor seleccione un respaldo")
+            return
+
+        backup_path = self.backup_tree.item(selected[0])['values'][2]
+        tarea = TareaRespaldo(self.gestor_respaldos.verificar_respaldo, backup_path)
+
+        def al_terminar(evento):
+            if evento[0] == 'fin':
+                informe = evento[1]
+                resumen = (f"Tablas: {informe['tablas']}\n"
+                           f"Filas: {informe['filas']:,}\n"
+                           f"Duración de la restauración: {informe['duracion']:.1f} s\n"
+                           f"Velocidad: {informe['filas_por_segundo']:,} filas/s")
+                if not informe['comparado']:
+                    messagebox.showwarning("Verificación", "El respaldo se restauró, pero no tiene filas ni "
+                                           "sumas por tabla con qué comparar su contenido (respaldo mysqldump)."
+                                           f"\n\n{resumen}")
+                elif informe['correcto']:
+                    messagebox.showinfo("Verificación", f"El respaldo se restauró correctamente\n\n{resumen}")
+                else:
+                    diferencias = '\n'.join(informe['diferencias'][:20])
+                    messagebox.showerror("Verificación", f"El respaldo no coincide con el original\n\n"
+                                         f"{diferencias}\n\n{resumen}")
+            elif evento[0] == 'cancelado':
+                messagebox.showinfo("Verificación", "Verificación cancelada")
+            else:
+                messagebox.showerror("Error", f"Error al verificar el respaldo: {evento[1]}")
+
+        self.ejecutar_tarea_respaldo("Verificando respaldo", tarea, al_terminar)
+
+    def ejecutar_tarea_respaldo(self, titulo, tarea, al_terminar):
+        """
+        Ejecutar un respaldo o una restauración en segundo plano mostrando el avance.
+        La ventana no es modal: se puede seguir usando el sistema mientras tanto
+        """
+        if getattr(self, 'tarea_respaldo', None) and self.tarea_respaldo.en_curso():
+            messagebox.showwarning("Advertencia", "Ya hay un respaldo o una restauración en curso")
+            return
+        self.tarea_respaldo = tarea
+        for boton in self.botones_respaldo:
+            boton.configure(state='disabled')
+
+        # La ventana depende de la ventana principal para seguir abierta aunque se cambie de módulo
+        dialog = tk.Toplevel(self.winfo_toplevel())
+        dialog.title(titulo)
+        dialog.geometry("420x150")
+        dialog.resizable(False, False)
+        dialog.transient(self.winfo_toplevel())
+
+        frame = ttk.Frame(dialog, padding="20")
+        frame.pack(fill=tk.BOTH, expand=True)
+
+        estado_var = tk.StringVar(value=f"{titulo}...")
+        ttk.Label(frame, textvariable=estado_var).pack(fill=tk.X, pady=(0, 10))
+        barra = ttk.Progressbar(frame, mode='determinate', maximum=100)
+        barra.pack(fill=tk.X)
+
+        def cancelar():
+            if messagebox.askyesno("Confirmar", "¿Desea cancelar la operación?", parent=dialog):
+                tarea.cancelar()
+                boton_cancelar.configure(state='disabled')
+                estado_var.set("Cancelando...")
+
+        boton_cancelar = ttk.Button(frame, text="Cancelar", command=cancelar)
+        boton_cancelar.pack(pady=(10, 0))
+        dialog.protocol("WM_DELETE_WINDOW", cancelar)
+
+        inicio = time.perf_counter()
+        tarea.iniciar()
+
+        def verificar_avance():
+            try:
+                while True:
+                    evento = tarea.eventos.get_nowait()
+                    if evento[0] == 'avance':
+                        if not tarea.cancelacion.is_set():
+                            _, hecho, total, unidad = evento
+                            estado_var.set(self.formatear_avance(titulo, hecho, total, unidad,
+                                                                 time.perf_counter() - inicio))
+                            if total:
+                                barra['value'] = min(100, hecho * 100 / total)
+                    else:
+                        dialog.destroy()
+                        if self.winfo_exists():
+                            for boton in self.botones_respaldo:
+                                boton.configure(state='normal')
+                        al_terminar(evento)
+                        return
+            except queue.Empty:
+                pass
+            dialog.after(100, verificar_avance)
+
+        dialog.after(100, verificar_avance)
+
+    def formatear_avance(self, titulo, hecho, total, unidad, segundos):
+        """Texto de avance: cantidad procesada, total (si se conoce) y velocidad"""
+        if unidad == 'bytes':
+            texto = f"{titulo}: {self.formatear_tamaño(hecho)}"
+            if total:
+                texto += f" de {self.formatear_tamaño(total)}"
+            return texto + f" ({self.formatear_tamaño(hecho / max(segundos, 0.001))}/s)"
+        texto = f"{titulo}: {hecho:,} filas"
+        if total:
+            texto += f" de ~{total:,}"
+        return texto + f" ({hecho / max(segundos, 0.001):,.0f} filas/s)"
 
 
     def cargar_respaldos(self):
-        """Cargar lista de respaldos disponibles"""
+        """Cargar lista de respaldos disponibles desde el catálogo (manifiesto)"""
         # Limpiar treeview
         for item in self.backup_tree.get_children():
             self.backup_tree.delete(item)
             
-        # Listar archivos en directorio de respaldos
-        if os.path.exists(self.backup_dir):
-            for file in os.listdir(self.backup_dir):
-                if file.endswith('.sql'):
-                    path = os.path.join(self.backup_dir, file)
-                    stats = os.stat(path)
-                    
-                    # Convertir timestamp a fecha legible
-                    fecha = datetime.fromtimestamp(stats.st_mtime)
-                    fecha_str = fecha.strftime('%d-%m-%Y %H:%M:%S')
-                    
-                    # Convertir tamaño a formato legible
-                    size = stats.st_size
-                    if size < 1024:
-                        size_str = f"{size} B"
-                    elif size < 1024**2:
-                        size_str = f"{size/1024:.1f} KB"
-                    else:
-                        size_str = f"{size/1024**2:.1f} MB"
-                    
-                    self.backup_tree.insert('', 'end', values=(
-                        fecha_str,
-                        size_str,
-                        path
-                    ))
+        try:
+            respaldos = self.gestor_respaldos.listar_respaldos()
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al leer el catálogo de respaldos: {str(e)}")
+            return
 
+        for respaldo in respaldos:
+            # Convertir fecha a formato legible
+            fecha = datetime.strptime(respaldo['fecha'], '%Y-%m-%d %H:%M:%S')
+            tipo = respaldo.get('tipo', 'completo')
+            if respaldo.get('formato') == 'mysqldump':
+                tipo = 'mysqldump'
+            
+            self.backup_tree.insert('', 'end', values=(
+                fecha.strftime('%d-%m-%Y %H:%M:%S'),
+                self.formatear_tamaño(respaldo['tamaño']),
+                os.path.join(self.backup_dir, respaldo['archivo']),
+                tipo,
+                f"{respaldo['filas']:,}" if 'filas' in respaldo else '',
+                f"{respaldo['duracion']:.1f} s" if 'duracion' in respaldo else ''
+            ))
+
+    def formatear_tamaño(self, size):
+        """Convertir tamaño a formato legible"""
+        if size < 1024:
+            return f"{size:.0f} B"
+        elif size < 1024**2:
+            return f"{size/1024:.1f} KB"
+        return f"{size/1024**2:.1f} MB"
+
+
+    def contar_logs(self):
+        """
+        Total aproximado de registros a partir del rango de id_log (lectura por clave primaria).
+        La auditoría no se borra, así que solo difiere del COUNT(*) en los huecos del autoincremento
+        """
+        query = "SELECT COALESCE(MAX(id_log) - MIN(id_log) + 1, 0) FROM auditoria"
+        return self.db_manager.ejecutar_query(query, fetchone=True)[0]
 
-    def cargar_logs(self):
+    def cargar_logs(self, direccion='primera'):
+        """
+        Cargar una página de la auditoría por clave (fecha, id_log) en lugar de OFFSET,
+        así cualquier página cuesta lo mismo sin importar su profundidad.
+        direccion: 'primera', 'siguiente', 'anterior' o 'ultima'
+        """
         try:
-            # Query para contar registros
-            query_count = "SELECT COUNT(*) FROM auditoria"
-            self.total_registros = self.db_manager.ejecutar_query(query_count, fetchone=True)[0]
-            
             registros_por_pagina = int(self.registros_pagina.get())
-            self.total_paginas = (self.total_registros + registros_por_pagina - 1) // registros_por_pagina
-            
-            if self.pagina_actual > self.total_paginas:
-                self.pagina_actual = self.total_paginas
-            if self.pagina_actual < 1:
-                self.pagina_actual = 1
 
-            offset = (self.pagina_actual - 1) * registros_por_pagina
+            # El total solo se usa para mostrar el número de páginas; se recalcula al volver al inicio
+            if direccion == 'primera' or not self.total_registros:
+                self.total_registros = self.contar_logs()
+            self.total_paginas = max(1, (self.total_registros + registros_por_pagina - 1) // registros_por_pagina)
 
-            # Query actualizado para incluir el rol
+            condicion = ""
+            params = []
+            if direccion == 'siguiente' and self.ultima_clave:
+                condicion = "WHERE a.fecha < %s OR (a.fecha = %s AND a.id_log < %s)"
+                params = [self.ultima_clave[0], self.ultima_clave[0], self.ultima_clave[1]]
+            elif direccion == 'anterior' and self.primera_clave:
+                condicion = "WHERE a.fecha > %s OR (a.fecha = %s AND a.id_log > %s)"
+                params = [self.primera_clave[0], self.primera_clave[0], self.primera_clave[1]]
+
+            # Hacia atrás se recorre en orden ascendente y luego se invierte
+            orden = "ASC" if direccion in ('anterior', 'ultima') else "DESC"
+
+            # Se pide un registro de más para saber si hay otra página en esa dirección;
+            # idx_auditoria_fecha incluye id_log (clave primaria), así que el orden sale del índice
             query = f"""
             SELECT DATE_FORMAT(a.fecha, '%d-%m-%Y %H:%i') as fecha, 
                 a.usuario, 
                 COALESCE(a.rol, 'No especificado') as rol,
                 a.accion, 
                 a.tabla, 
-                a.detalle
+                a.detalle,
+                a.fecha,
+                a.id_log
             FROM auditoria a
-            ORDER BY a.fecha DESC
-            LIMIT {registros_por_pagina} OFFSET {offset}
+            {condicion}
+            ORDER BY a.fecha {orden}, a.id_log {orden}
+            LIMIT %s
             """
+            params.append(registros_por_pagina + 1)
             
-            logs = self.db_manager.ejecutar_query(query)
-            self.actualizar_treeview(logs)
+            logs = self.db_manager.ejecutar_query(query, params)
+            hay_mas = len(logs) > registros_por_pagina
+            logs = logs[:registros_por_pagina]
+            if orden == "ASC":
+                logs.reverse()
+
+            # Al retroceder hasta el inicio con una página incompleta, mostrar la primera página completa
+            if direccion == 'anterior' and not hay_mas and len(logs) < registros_por_pagina:
+                return self.cargar_logs('primera')
+
+            if direccion == 'primera':
+                self.pagina_actual = 1
+                self.hay_anterior, self.hay_siguiente = False, hay_mas
+            elif direccion == 'siguiente':
+                self.pagina_actual += 1
+                self.hay_anterior, self.hay_siguiente = True, hay_mas
+            elif direccion == 'anterior':
+                self.pagina_actual = self.pagina_actual - 1 if hay_mas else 1
+                self.hay_anterior, self.hay_siguiente = hay_mas, True
+            else:
+                self.pagina_actual = self.total_paginas
+                self.hay_anterior, self.hay_siguiente = hay_mas, False
+
+            # Ajustar el total estimado con lo que se sabe al recorrer
+            if not self.hay_siguiente:
+                self.total_paginas = self.pagina_actual
+            self.pagina_actual = max(1, self.pagina_actual)
+            self.total_paginas = max(self.total_paginas, self.pagina_actual)
+
+            if logs:
+                self.primera_clave = (logs[0][6], logs[0][7])
+                self.ultima_clave = (logs[-1][6], logs[-1][7])
+            else:
+                self.primera_clave = self.ultima_clave = None
+
+            self.actualizar_treeview([log[:6] for log in logs])
             self.actualizar_controles_paginacion()
                     
         except Exception as e:
@@ -466,33 +664,28 @@ class MantenimientoForm(ttk.Frame):
         self.lbl_pagina.configure(text=f"Página {self.pagina_actual} de {self.total_paginas}")
         
         # Habilitar/deshabilitar botones según corresponda
-        self.btn_primera.configure(state='normal' if self.pagina_actual > 1 else 'disabled')
-        self.btn_anterior.configure(state='normal' if self.pagina_actual > 1 else 'disabled')
-        self.btn_siguiente.configure(state='normal' if self.pagina_actual < self.total_paginas else 'disabled')
-        self.btn_ultima.configure(state='normal' if self.pagina_actual < self.total_paginas else 'disabled')
+        self.btn_primera.configure(state='normal' if self.hay_anterior else 'disabled')
+        self.btn_anterior.configure(state='normal' if self.hay_anterior else 'disabled')
+        self.btn_siguiente.configure(state='normal' if self.hay_siguiente else 'disabled')
+        self.btn_ultima.configure(state='normal' if self.hay_siguiente else 'disabled')
 
     def primera_pagina(self):
-        self.pagina_actual = 1
-        self.cargar_logs()
+        self.cargar_logs('primera')
 
     def pagina_anterior(self):
-        if self.pagina_actual > 1:
-            self.pagina_actual -= 1
-            self.cargar_logs()
+        if self.hay_anterior:
+            self.cargar_logs('anterior')
 
     def pagina_siguiente(self):
-        if self.pagina_actual < self.total_paginas:
-            self.pagina_actual += 1
-            self.cargar_logs()
+        if self.hay_siguiente:
+            self.cargar_logs('siguiente')
 
     def ultima_pagina(self):
-        self.pagina_actual = self.total_paginas
-        self.cargar_logs()
+        self.cargar_logs('ultima')
 
     def cambiar_registros_pagina(self, event):
         """Cuando se cambia el número de registros por página"""
-        self.pagina_actual = 1  # Volver a la primera página
-        self.cargar_logs()
+        self.cargar_logs('primera')  # Volver a la primera página
 
     def actualizar_treeview(self, registros):
         """
@@ -1,5 +1,8 @@
+import multiprocessing
 from formularios.form_login import LoginForm
 
 if __name__ == "__main__":
+    # Necesario para el pool de procesos de los recibos en el ejecutable de Windows
+    multiprocessing.freeze_support()
     app = LoginForm()  # Inicia la ventana de inicio de sesión
     app.mainloop()
\ No newline at end of file
@@ -0,0 +1,18 @@
+-- Clave única de notificaciones por (usuario, tipo, entidad, día).
+-- La usa NotificationManager.verificar_y_crear_notificaciones para no duplicar
+-- notificaciones sin consultar una por una si ya existen.
+
+-- 1. Eliminar duplicados existentes (se conserva la notificación más antigua)
+DELETE n1
+FROM notificaciones n1
+JOIN notificaciones n2
+  ON n1.id_usuario = n2.id_usuario
+ AND n1.tipo = n2.tipo
+ AND n1.entidad_id = n2.entidad_id
+ AND DATE(n1.fecha_generacion) = DATE(n2.fecha_generacion)
+ AND n1.id_notificacion > n2.id_notificacion;
+
+-- 2. Día de generación como columna calculada y clave única
+ALTER TABLE notificaciones
+  ADD COLUMN dia DATE GENERATED ALWAYS AS (DATE(fecha_generacion)) STORED,
+  ADD UNIQUE KEY uk_notificacion_dia (id_usuario, tipo, entidad_id, dia);
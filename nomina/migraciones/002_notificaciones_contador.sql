@@ -0,0 +1,53 @@
+-- Contador de notificaciones por usuario, mantenido por triggers.
+-- Lo usa NotificationManager.obtener_estado_notificaciones para que los clientes
+-- consulten sus no leídas y la última notificación con una lectura por clave primaria,
+-- y pidan solo las notificaciones con id mayor al último que ya tienen.
+-- Aplicar con la aplicación y el programador de notificaciones detenidos.
+
+-- 1. Tabla del contador
+CREATE TABLE IF NOT EXISTS notificaciones_contador (
+  id_usuario BIGINT NOT NULL,
+  no_leidas INT NOT NULL DEFAULT 0,
+  ultima_id INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (id_usuario)
+) ENGINE=InnoDB;
+
+-- 2. Triggers que mantienen el contador
+DROP TRIGGER IF EXISTS trg_notificaciones_contador_insert;
+DROP TRIGGER IF EXISTS trg_notificaciones_contador_update;
+DROP TRIGGER IF EXISTS trg_notificaciones_contador_delete;
+
+CREATE TRIGGER trg_notificaciones_contador_insert
+AFTER INSERT ON notificaciones
+FOR EACH ROW
+  INSERT INTO notificaciones_contador (id_usuario, no_leidas, ultima_id)
+  SELECT NEW.id_usuario, NEW.estado <=> 'no_leida', NEW.id_notificacion
+  FROM DUAL
+  WHERE NEW.id_usuario IS NOT NULL
+  ON DUPLICATE KEY UPDATE
+    no_leidas = no_leidas + (NEW.estado <=> 'no_leida'),
+    ultima_id = GREATEST(ultima_id, NEW.id_notificacion);
+
+CREATE TRIGGER trg_notificaciones_contador_update
+AFTER UPDATE ON notificaciones
+FOR EACH ROW
+  UPDATE notificaciones_contador
+  SET no_leidas = no_leidas + (NEW.estado <=> 'no_leida') - (OLD.estado <=> 'no_leida')
+  WHERE id_usuario = NEW.id_usuario
+  AND NOT (NEW.estado <=> OLD.estado);
+
+CREATE TRIGGER trg_notificaciones_contador_delete
+AFTER DELETE ON notificaciones
+FOR EACH ROW
+  UPDATE notificaciones_contador
+  SET no_leidas = no_leidas - 1
+  WHERE id_usuario = OLD.id_usuario
+  AND OLD.estado = 'no_leida';
+
+-- 3. Carga inicial con las notificaciones existentes
+DELETE FROM notificaciones_contador;
+INSERT INTO notificaciones_contador (id_usuario, no_leidas, ultima_id)
+SELECT id_usuario, SUM(estado <=> 'no_leida'), MAX(id_notificacion)
+FROM notificaciones
+WHERE id_usuario IS NOT NULL
+GROUP BY id_usuario;
@@ -0,0 +1,7 @@
+-- Índice FULLTEXT para la búsqueda en la auditoría.
+-- Lo usa MantenimientoForm.buscar_registros con MATCH ... AGAINST en modo booleano,
+-- en lugar de LIKE '%texto%' sobre cuatro columnas (que recorría toda la tabla).
+-- La primera vez InnoDB reconstruye la tabla para agregar la columna interna FTS_DOC_ID.
+
+ALTER TABLE auditoria
+  ADD FULLTEXT INDEX ft_auditoria_busqueda (usuario, accion, tabla, detalle);
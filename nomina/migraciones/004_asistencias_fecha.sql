@@ -0,0 +1,18 @@
+-- Fecha de la asistencia como columna calculada y almacenada, con su índice.
+-- Las consultas de asistencias e inasistencias filtraban con DATE(a.entrada) = fecha,
+-- que no puede usar ningún índice y recorre todas las asistencias del empleado (o de la tabla).
+-- Con a.fecha = fecha y el índice (id_empleado, fecha, entrada) cada día de cada empleado
+-- es una búsqueda directa en el índice.
+-- MySQL calcula la columna al insertar o actualizar: no cambia cómo se registran las asistencias.
+-- Aplicar con la aplicación y los terminales de asistencia detenidos (la tabla se reconstruye).
+
+-- 1. Columna calculada
+ALTER TABLE asistencias
+  ADD COLUMN fecha DATE GENERATED ALWAYS AS (DATE(entrada)) STORED AFTER salida;
+
+-- 2. Índice compuesto; reemplaza al índice de id_empleado, que queda cubierto por él
+ALTER TABLE asistencias
+  ADD INDEX idx_asistencias_empleado_fecha (id_empleado, fecha, entrada);
+
+ALTER TABLE asistencias
+  DROP INDEX asistencia_id_empleado_fkey;
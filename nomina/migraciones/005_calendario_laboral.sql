@@ -0,0 +1,49 @@
+-- Calendario laboral persistente: un registro por día con sus indicadores.
+-- Reemplaza al calendario que obtener_asistencias, obtener_inasistencias_empleado y
+-- obtener_inasistencias_periodo generaban en cada consulta con WITH RECURSIVE.
+-- Solo se consideran los días con laborable = 1: los feriados no cuentan como inasistencia,
+-- y en los días de medio día bastan 2 horas trabajadas en lugar de 4.
+-- Los feriados se administran con DatabaseManager.registrar_feriado / eliminar_feriado;
+-- crear_periodo agrega los días que falten del período (generar_calendario).
+
+-- 1. Tabla del calendario
+CREATE TABLE IF NOT EXISTS calendario_laboral (
+  fecha DATE NOT NULL,
+  laborable TINYINT(1) NOT NULL,
+  feriado TINYINT(1) NOT NULL DEFAULT 0,
+  medio_dia TINYINT(1) NOT NULL DEFAULT 0,
+  descripcion VARCHAR(100) DEFAULT NULL,
+  PRIMARY KEY (fecha)
+) ENGINE=InnoDB;
+
+-- 2. Días de 2020 a 2040: de lunes a viernes laborables, sábados y domingos no
+SET SESSION cte_max_recursion_depth = 10000;
+
+INSERT IGNORE INTO calendario_laboral (fecha, laborable)
+WITH RECURSIVE dias AS (
+  SELECT DATE('2020-01-01') AS fecha
+  UNION ALL
+  SELECT fecha + INTERVAL 1 DAY FROM dias WHERE fecha < '2040-12-31'
+)
+SELECT fecha, DAYOFWEEK(fecha) NOT IN (1, 7)
+FROM dias;
+
+-- 3. Feriados nacionales de fecha fija. Los móviles (Carnaval, Semana Santa)
+-- se registran cada año con registrar_feriado
+UPDATE calendario_laboral
+SET laborable = 0,
+    feriado = 1,
+    descripcion = CASE DATE_FORMAT(fecha, '%m-%d')
+        WHEN '01-01' THEN 'Año Nuevo'
+        WHEN '04-19' THEN 'Declaración de la Independencia'
+        WHEN '05-01' THEN 'Día del Trabajador'
+        WHEN '06-24' THEN 'Batalla de Carabobo'
+        WHEN '07-05' THEN 'Día de la Independencia'
+        WHEN '07-24' THEN 'Natalicio del Libertador'
+        WHEN '10-12' THEN 'Día de la Resistencia Indígena'
+        WHEN '12-24' THEN 'Víspera de Navidad'
+        WHEN '12-25' THEN 'Navidad'
+        WHEN '12-31' THEN 'Fin de Año'
+    END
+WHERE DATE_FORMAT(fecha, '%m-%d') IN
+    ('01-01', '04-19', '05-01', '06-24', '07-05', '07-24', '10-12', '12-24', '12-25', '12-31');
@@ -0,0 +1,39 @@
+from util.config import DB_CONFIG, PROGRAMADOR_NOTIFICACIONES
+from util.db_manager import DatabaseManager
+from util.notification_manager import NotificationManager
+from util.programador import Programador
+
+# Nombre del bloqueo de MySQL que impide ejecutar dos programadores a la vez
+BLOQUEO_PROGRAMADOR = 'nominadb.programador_notificaciones'
+
+
+def generar_notificaciones(notification_manager):
+    if not notification_manager.verificar_y_crear_notificaciones():
+        raise Exception("No se pudieron generar las notificaciones")
+
+
+def limpiar_notificaciones(notification_manager):
+    if not notification_manager.eliminar_notificaciones_antiguas(
+            PROGRAMADOR_NOTIFICACIONES['dias_conservar']):
+        raise Exception("No se pudieron eliminar las notificaciones antiguas")
+
+
+if __name__ == "__main__":
+    # Proceso sin interfaz que genera las notificaciones de todos los usuarios.
+    # Se ejecuta desde la carpeta nomina: python programador_notificaciones.py
+    notification_manager = NotificationManager(DatabaseManager(**DB_CONFIG))
+
+    programador = Programador(DB_CONFIG, BLOQUEO_PROGRAMADOR)
+    programador.agregar_tarea('generar_notificaciones',
+                              PROGRAMADOR_NOTIFICACIONES['generar'],
+                              lambda: generar_notificaciones(notification_manager),
+                              al_iniciar=True)
+    programador.agregar_tarea('limpiar_notificaciones',
+                              PROGRAMADOR_NOTIFICACIONES['limpiar'],
+                              lambda: limpiar_notificaciones(notification_manager))
+
+    if not programador.adquirir_bloqueo():
+        print("Ya hay otro programador de notificaciones en ejecución; "
+              "este queda en espera por si el otro se detiene")
+
+    programador.ejecutar()
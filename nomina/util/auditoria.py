@@ -0,0 +1,160 @@
+import atexit
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+from mysql.connector import Error, errors
+
+
+class EscritorAuditoria:
+    """
+    Escribe los registros de auditoría en segundo plano y por lotes.
+    registrar() solo encola el registro, así la auditoría no agrega espera a las
+    acciones del usuario. Si la base de datos no está disponible los registros se
+    guardan en un archivo local y se reenvían en cuanto vuelve la conexión
+    """
+    QUERY_INSERTAR = """
+    INSERT INTO auditoria (fecha, usuario, rol, accion, tabla, detalle)
+    VALUES (%s, %s, %s, %s, %s, %s)
+    """
+    # Errores causados por el contenido de un registro. Otros, como una tabla que no existe
+    # (durante una restauración) o un permiso denegado (ProgrammingError), no son culpa del
+    # registro: se trata igual que una caída y los registros se guardan localmente
+    ERRORES_REGISTRO = (errors.DataError, errors.IntegrityError)
+
+    def __init__(self, pool, lote=100, intervalo=2, archivo_pendientes='auditoria_pendiente.jsonl'):
+        self.pool = pool
+        self.lote = lote
+        self.intervalo = intervalo
+        self.archivo_pendientes = archivo_pendientes
+
+        self._cola = queue.Queue()
+        self._detener = threading.Event()
+        self._hilo = None
+        self._hilo_lock = threading.Lock()
+
+    def registrar(self, usuario, rol, accion, tabla, detalle):
+        """Encolar un registro; la fecha es la del momento de la acción, no la de la escritura"""
+        fecha = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self._cola.put((fecha, usuario, rol, accion, tabla, detalle))
+        self.iniciar()
+
+    def iniciar(self):
+        with self._hilo_lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._detener.clear()
+                self._hilo = threading.Thread(target=self._trabajar, daemon=True)
+                self._hilo.start()
+
+    def cerrar(self, espera=10):
+        """Escribir lo que quede en la cola y detener el hilo (se llama al salir)"""
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(espera)
+
+    def pendientes(self):
+        return self._cola.qsize()
+
+    def _trabajar(self):
+        while True:
+            registros = self._tomar_lote()
+            if registros or os.path.exists(self.archivo_pendientes):
+                self._escribir(registros)
+            if self._detener.is_set() and self._cola.empty():
+                break
+
+    def _tomar_lote(self):
+        """Esperar el primer registro y juntar los que ya estén en cola, hasta el tamaño del lote"""
+        registros = []
+        try:
+            if self._detener.is_set():
+                registros.append(self._cola.get_nowait())
+            else:
+                registros.append(self._cola.get(timeout=self.intervalo))
+            while len(registros) < self.lote:
+                registros.append(self._cola.get_nowait())
+        except queue.Empty:
+            pass
+        return registros
+
+    def _escribir(self, registros):
+        # Los registros guardados durante una caída se reenvían primero para conservar el orden
+        guardados = self._leer_pendientes()
+        try:
+            self._insertar(guardados + registros)
+            if guardados:
+                os.remove(self.archivo_pendientes)
+                print(f"Se reenviaron {len(guardados)} registros de auditoría pendientes")
+        except self.ERRORES_REGISTRO as e:
+            # Un registro inválido no debe bloquear el resto: se insertan uno por uno
+            print(f"Error en un lote de auditoría, se escribe registro por registro: {e}")
+            if guardados:
+                os.remove(self.archivo_pendientes)
+            self._insertar_individualmente(guardados + registros)
+        except Exception as e:
+            if registros:
+                print(f"Error al escribir la auditoría, se guarda localmente: {e}")
+                self._guardar_pendientes(registros)
+            if not self._detener.is_set():
+                self._detener.wait(self.intervalo)
+
+    def _insertar(self, registros):
+        if not registros:
+            return
+        conexion = self.pool.obtener()
+        try:
+            cursor = conexion.cursor()
+            for inicio in range(0, len(registros), self.lote):
+                cursor.executemany(self.QUERY_INSERTAR, registros[inicio:inicio + self.lote])
+            conexion.commit()
+            cursor.close()
+        except Error:
+            conexion.rollback()
+            raise
+        finally:
+            conexion.close()
+
+    def _insertar_individualmente(self, registros):
+        for posicion, registro in enumerate(registros):
+            try:
+                self._insertar([registro])
+            except self.ERRORES_REGISTRO as e:
+                print(f"Registro de auditoría descartado {registro}: {e}")
+            except Exception as e:
+                print(f"Error al escribir la auditoría, se guarda localmente: {e}")
+                self._guardar_pendientes(registros[posicion:])
+                return
+
+    def _leer_pendientes(self):
+        if not os.path.exists(self.archivo_pendientes):
+            return []
+        try:
+            with open(self.archivo_pendientes, encoding='utf-8') as archivo:
+                return [tuple(json.loads(linea)) for linea in archivo if linea.strip()]
+        except (OSError, ValueError) as e:
+            print(f"Error al leer la auditoría pendiente: {e}")
+            return []
+
+    def _guardar_pendientes(self, registros):
+        try:
+            with open(self.archivo_pendientes, 'a', encoding='utf-8') as archivo:
+                for registro in registros:
+                    archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+        except OSError as e:
+            print(f"Error al guardar la auditoría pendiente, se pierden {len(registros)} registros: {e}")
+
+
+_escritores = {}
+_escritores_lock = threading.Lock()
+
+def obtener_escritor_auditoria(pool, **opciones):
+    """Obtener (o crear) el escritor de auditoría compartido para un pool de conexiones"""
+    with _escritores_lock:
+        escritor = _escritores.get(id(pool))
+        if escritor is None:
+            escritor = EscritorAuditoria(pool, **opciones)
+            _escritores[id(pool)] = escritor
+            # Al cerrar la aplicación se escribe lo que quede en la cola
+            atexit.register(escritor.cerrar)
+        return escritor
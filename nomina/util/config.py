@@ -5,4 +5,48 @@ DB_CONFIG = {
     'database': 'nominadb',
     'user': 'root',
     'password': 'admin'
-}
\ No newline at end of file
+}
+
+# Pool de conexiones compartido por todos los DatabaseManager
+POOL_CONFIG = {
+    'tamaño': 5,                 # Conexiones máximas abiertas a la vez
+    'espera_maxima': 10,         # Segundos que se espera por una conexión libre
+    'max_inactividad': 300,      # Segundos antes de cerrar una conexión ociosa
+    'intervalo_verificacion': 30 # Segundos de inactividad antes de verificar (ping) una conexión
+}
+
+# Programador central de notificaciones (programador_notificaciones.py), expresiones tipo cron
+PROGRAMADOR_NOTIFICACIONES = {
+    'generar': '*/5 * * * *',    # Generar notificaciones cada 5 minutos
+    'limpiar': '0 3 * * *',      # Borrar notificaciones leídas antiguas a las 3:00
+    'dias_conservar': 30         # Días que se conservan las notificaciones leídas
+}
+
+# Milisegundos entre consultas del contador de notificaciones en cada cliente
+INTERVALO_NOTIFICACIONES = 60000
+
+# Escritor de auditoría en segundo plano (util/auditoria.py)
+AUDITORIA_CONFIG = {
+    'lote': 100,                 # Registros máximos por INSERT
+    'intervalo': 2,              # Segundos entre escrituras y entre reintentos
+    'archivo_pendientes': 'auditoria_pendiente.jsonl'  # Registros guardados mientras la base de datos no responde
+}
+
+# Respaldos de la base de datos (util/respaldos.py)
+RESPALDOS_CONFIG = {
+    'directorio': 'backups',
+    # Rutas de mysqldump y mysql; con None se buscan en el PATH. Solo se usan con el motor
+    # 'mysqldump' y al restaurar respaldos .sql
+    'mysqldump': None,
+    'mysql': None,
+    'motor': 'paralelo',         # 'paralelo' (por tablas, en Python) o 'mysqldump'
+    'hilos': 4,                  # Conexiones simultáneas del motor paralelo
+    'filas_por_lote': 1000,      # Filas por lote al volcar y por INSERT al restaurar
+    'filas_por_consulta': 10000, # Filas por tramo de clave primaria al volcar
+    # Tamaño máximo de cada INSERT al restaurar (como mucho la mitad de max_allowed_packet)
+    'bytes_por_lote': 4 * 1024 * 1024,
+    'max_incrementales': 6,      # Respaldos incrementales seguidos antes de forzar uno completo
+    # Retención abuelo-padre-hijo: se conserva el último respaldo de cada uno de los
+    # últimos N días, semanas y meses; el resto se borra después de cada respaldo
+    'retencion': {'diarios': 7, 'semanales': 4, 'mensuales': 12}
+}
@@ -1,31 +1,28 @@
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 import bcrypt
-import mysql.connector
 from mysql.connector import Error
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
 from reportlab.lib.styles import getSampleStyleSheet
+from util.config import POOL_CONFIG, AUDITORIA_CONFIG
+from util.pool_conexiones import obtener_pool
+from util.auditoria import obtener_escritor_auditoria
 
 class DatabaseManager:
-    def __init__(self, host, database, user, password):
+    def __init__(self, host, database, user, password, pool_config=None):
         self.host = host
         self.database = database
         self.user = user
         self.password = password
+        self.pool = obtener_pool(host, database, user, password,
+                                 **(pool_config or POOL_CONFIG))
 
     def connect(self):
+        """Obtener una conexión del pool. Al cerrarla vuelve al pool"""
         try:
-            connection = mysql.connector.connect(
-                host=self.host,
-                database=self.database,
-                user=self.user,
-                password=self.password
-            )
-            if connection.is_connected():
-                print(f"Conectado exitosamente a la base de datos: {self.database}")
-                return connection
+            return self.pool.obtener()
         except Error as e:
             print(f"Error while connecting to MySQL: {e}")
         return None
@@ -399,19 +396,14 @@ class DatabaseManager:
             return self.ejecutar_query(query, params=(id_empleado,))
     
     def obtener_asistencias(self, fecha_inicio, fecha_fin, id_empleado=None):
-        # Query base que genera todos los días laborables en el rango de fechas
+        self._asegurar_calendario(fecha_inicio, fecha_fin)
+        # Query base con todos los días laborables en el rango de fechas
         query = """
-        WITH RECURSIVE calendario AS (
-            SELECT CAST(%s AS DATE) AS fecha
-            UNION ALL
-            SELECT DATE_ADD(fecha, INTERVAL 1 DAY)
-            FROM calendario
-            WHERE fecha < %s
-        ),
-        dias_laborables AS (
-            SELECT fecha
-            FROM calendario
-            WHERE DAYOFWEEK(fecha) NOT IN (1, 7)  -- Excluir sábados (7) y domingos (1)
+        WITH dias_laborables AS (
+            SELECT fecha, medio_dia
+            FROM calendario_laboral
+            WHERE fecha BETWEEN %s AND %s
+            AND laborable = 1  -- Excluir fines de semana y feriados
         ),
         empleados_seleccionados AS (
             SELECT id_empleado, nombre, apellido, cedula_identidad
@@ -438,11 +430,12 @@ class DatabaseManager:
                 WHEN a.salida IS NULL THEN 'Incompleto'
                 ELSE 'Presente'
             END as estado,
-            COALESCE(a.observacion, '') as observacion
+            COALESCE(a.observacion, '') as observacion,
+            dl.medio_dia
         FROM dias_laborables dl
         CROSS JOIN empleados_seleccionados e
-        LEFT JOIN asistencias a ON DATE(a.entrada) = dl.fecha 
-            AND a.id_empleado = e.id_empleado
+        LEFT JOIN asistencias a ON a.id_empleado = e.id_empleado
+            AND a.fecha = dl.fecha
         ORDER BY dl.fecha DESC, empleado
         """
 
@@ -480,7 +473,7 @@ class DatabaseManager:
         # Verificar si existe un registro de asistencia para ese día
         query_check = """
         SELECT id FROM asistencias 
-        WHERE id_empleado = %s AND DATE(entrada) = %s
+        WHERE id_empleado = %s AND fecha = %s
         """
         asistencia_existente = self.ejecutar_query(query_check, params=(datos['empleado_id'], datos['fecha']), fetchone=True)
 
@@ -489,7 +482,7 @@ class DatabaseManager:
             query_update = """
             UPDATE asistencias 
             SET estado = 'justificada', observacion = %s
-            WHERE id_empleado = %s AND DATE(entrada) = %s
+            WHERE id_empleado = %s AND fecha = %s
             """
             self.ejecutar_query(query_update, params=(datos['observacion'], datos['empleado_id'], datos['fecha']), commit=True)
         else:
@@ -520,23 +513,20 @@ class DatabaseManager:
     def obtener_inasistencias_empleado(self, id_empleado, fecha_inicio, fecha_fin):
         """
         Obtiene las inasistencias del empleado incluyendo días sin registro y días con menos de 4 horas trabajadas
+        (2 en los días de medio día). Los feriados del calendario laboral no cuentan como inasistencia
         """
+        self._asegurar_calendario(fecha_inicio, fecha_fin)
         query = """
-        WITH RECURSIVE calendario AS (
-            SELECT CAST(%s AS DATE) AS fecha
-            UNION ALL
-            SELECT DATE_ADD(fecha, INTERVAL 1 DAY)
-            FROM calendario
-            WHERE fecha < %s
-        ),
-        dias_laborables AS (
-            SELECT fecha
-            FROM calendario
-            WHERE DAYOFWEEK(fecha) NOT IN (1, 7)
+        WITH dias_laborables AS (
+            SELECT fecha, medio_dia
+            FROM calendario_laboral
+            WHERE fecha BETWEEN %s AND %s
+            AND laborable = 1
         ),
         asistencias_calculadas AS (
             SELECT 
                 dl.fecha,
+                dl.medio_dia,
                 a.id,
                 a.entrada,
                 a.salida,
@@ -547,19 +537,19 @@ class DatabaseManager:
                     ELSE 0
                 END as horas_trabajadas
             FROM dias_laborables dl
-            LEFT JOIN asistencias a ON DATE(a.entrada) = dl.fecha
-                AND a.id_empleado = %s
+            LEFT JOIN asistencias a ON a.id_empleado = %s
+                AND a.fecha = dl.fecha
         )
         SELECT
             COUNT(*) as total_inasistencias,
-            GROUP_CONCAT(fecha) as fechas
-        FROM asistencias_calculadas
-        WHERE (id IS NULL OR salida IS NULL OR horas_trabajadas < 4)
+            GROUP_CONCAT(ac.fecha) as fechas
+        FROM asistencias_calculadas ac
+        WHERE (ac.id IS NULL OR ac.salida IS NULL OR ac.horas_trabajadas < IF(ac.medio_dia, 2, 4))
             AND NOT EXISTS (
-                SELECT 1 FROM asistencias
-                WHERE id_empleado = %s
-                AND DATE(entrada) = fecha
-                AND estado = 'justificada'
+                SELECT 1 FROM asistencias j
+                WHERE j.id_empleado = %s
+                AND j.fecha = ac.fecha
+                AND j.estado = 'justificada'
             )
         """
         # Ejecutar el query y obtener el resultado
@@ -575,7 +565,156 @@ class DatabaseManager:
             fechas = result[1].split(',') if result[1] else []
             return inasistencias, fechas
         return 0, []
-    
+
+    def obtener_inasistencias_periodo(self, fecha_inicio, fecha_fin):
+        """
+        Obtiene en una sola consulta la cantidad de inasistencias de todos los empleados activos.
+        Aplica las mismas reglas que obtener_inasistencias_empleado.
+        Retorna un diccionario {id_empleado: inasistencias}
+        """
+        self._asegurar_calendario(fecha_inicio, fecha_fin)
+        query = """
+        WITH dias_laborables AS (
+            SELECT fecha, medio_dia
+            FROM calendario_laboral
+            WHERE fecha BETWEEN %s AND %s
+            AND laborable = 1
+        ),
+        empleados_activos AS (
+            SELECT id_empleado
+            FROM empleados
+            WHERE COALESCE(status, 'activo') <> 'inactivo'
+        ),
+        asistencias_calculadas AS (
+            SELECT
+                e.id_empleado,
+                dl.fecha,
+                dl.medio_dia,
+                a.id,
+                a.salida,
+                CASE
+                    WHEN a.entrada IS NOT NULL AND a.salida IS NOT NULL THEN
+                        TIMESTAMPDIFF(HOUR, a.entrada, a.salida)
+                    ELSE 0
+                END as horas_trabajadas
+            FROM dias_laborables dl
+            CROSS JOIN empleados_activos e
+            LEFT JOIN asistencias a ON a.id_empleado = e.id_empleado
+                AND a.fecha = dl.fecha
+        )
+        SELECT ac.id_empleado, COUNT(*) as total_inasistencias
+        FROM asistencias_calculadas ac
+        WHERE (ac.id IS NULL OR ac.salida IS NULL OR ac.horas_trabajadas < IF(ac.medio_dia, 2, 4))
+            AND NOT EXISTS (
+                SELECT 1 FROM asistencias j
+                WHERE j.id_empleado = ac.id_empleado
+                AND j.fecha = ac.fecha
+                AND j.estado = 'justificada'
+            )
+        GROUP BY ac.id_empleado
+        """
+        result = self.ejecutar_query(query, params=(fecha_inicio, fecha_fin))
+        return {id_empleado: total for id_empleado, total in result or []}
+
+    def generar_calendario(self, fecha_inicio, fecha_fin):
+        """
+        Agregar al calendario laboral los días del rango que falten: de lunes a viernes laborables,
+        sábados y domingos no. Los días que ya existen (y sus feriados) no se modifican
+        """
+        fecha_inicio = _a_fecha(fecha_inicio)
+        fecha_fin = _a_fecha(fecha_fin)
+        dias = [fecha_inicio + timedelta(days=i) for i in range((fecha_fin - fecha_inicio).days + 1)]
+        if not dias:
+            return
+        query = "INSERT IGNORE INTO calendario_laboral (fecha, laborable) VALUES " + \
+            ", ".join(["(%s, %s)"] * len(dias))
+        params = []
+        for dia in dias:
+            params.extend([dia, dia.weekday() < 5])
+        self.ejecutar_query(query, params=params, commit=True)
+
+    def _asegurar_calendario(self, fecha_inicio, fecha_fin):
+        """Generar los días del rango que todavía no estén en el calendario laboral"""
+        fecha_inicio = _a_fecha(fecha_inicio)
+        fecha_fin = _a_fecha(fecha_fin)
+        dias = (fecha_fin - fecha_inicio).days + 1
+        if dias <= 0:
+            return
+        existentes = self.ejecutar_query("""
+        SELECT COUNT(*) FROM calendario_laboral WHERE fecha BETWEEN %s AND %s
+        """, params=(fecha_inicio, fecha_fin), fetchone=True)[0]
+        if existentes < dias:
+            self.generar_calendario(fecha_inicio, fecha_fin)
+
+    def obtener_calendario(self, fecha_inicio, fecha_fin):
+        """Días del calendario laboral en el rango, con sus indicadores de laborable, feriado y medio día"""
+        query = """
+        SELECT fecha, laborable, feriado, medio_dia, descripcion
+        FROM calendario_laboral
+        WHERE fecha BETWEEN %s AND %s
+        ORDER BY fecha
+        """
+        return self.ejecutar_query(query, params=(fecha_inicio, fecha_fin), dictionary=True)
+
+    def obtener_feriados(self, anio):
+        """Feriados y medios días de un año"""
+        query = """
+        SELECT fecha, feriado, medio_dia, descripcion
+        FROM calendario_laboral
+        WHERE fecha BETWEEN %s AND %s
+        AND (feriado = 1 OR medio_dia = 1)
+        ORDER BY fecha
+        """
+        return self.ejecutar_query(query, params=(f"{anio}-01-01", f"{anio}-12-31"), dictionary=True)
+
+    def registrar_feriado(self, fecha, descripcion, medio_dia=False):
+        """
+        Marcar un día como feriado (no laborable) o, con medio_dia, como laborable de medio día.
+        Los días feriados no cuentan como inasistencia; sábados y domingos no pueden ser medio día
+        """
+        if medio_dia and _a_fecha(fecha).weekday() >= 5:
+            raise ValueError("Un sábado o domingo no puede ser un día laborable de medio día")
+        query = """
+        INSERT INTO calendario_laboral (fecha, laborable, feriado, medio_dia, descripcion)
+        VALUES (%s, %s, %s, %s, %s) AS nuevo
+        ON DUPLICATE KEY UPDATE
+            laborable = nuevo.laborable,
+            feriado = nuevo.feriado,
+            medio_dia = nuevo.medio_dia,
+            descripcion = nuevo.descripcion
+        """
+        medio_dia = bool(medio_dia)
+        self.ejecutar_query(query, params=(fecha, medio_dia, not medio_dia, medio_dia, descripcion),
+                            commit=True)
+
+    def eliminar_feriado(self, fecha):
+        """Devolver un día a su condición normal: laborable de lunes a viernes"""
+        query = """
+        UPDATE calendario_laboral
+        SET laborable = DAYOFWEEK(fecha) NOT IN (1, 7),
+            feriado = 0,
+            medio_dia = 0,
+            descripcion = NULL
+        WHERE fecha = %s
+        """
+        self.ejecutar_query(query, params=(fecha,), commit=True)
+
+    def obtener_deducciones_configuradas(self):
+        """Obtener la configuración de deducciones"""
+        query = """
+        SELECT nombre, porcentaje, tipo
+        FROM deducciones
+        """
+        return self.ejecutar_query(query, dictionary=True)
+
+    def obtener_bonificaciones_configuradas(self):
+        """Obtener la configuración de bonificaciones"""
+        query = """
+        SELECT nombre, porcentaje, tipo, condicion
+        FROM bonificaciones
+        """
+        return self.ejecutar_query(query, dictionary=True)
+
     def crear_periodo(self, fecha_inicio, fecha_fin, tipo, creado_por):
 
         query = """
@@ -583,6 +722,8 @@ class DatabaseManager:
         VALUES (%s, %s, %s, 'abierto', %s)
         """
         self.ejecutar_query(query, (fecha_inicio, fecha_fin, tipo, creado_por), commit=True)
+        # Las inasistencias del período se calculan con el calendario laboral
+        self.generar_calendario(fecha_inicio, fecha_fin)
 
     def verificar_solapamiento_periodos(self, fecha_inicio, fecha_fin):
 
@@ -656,23 +797,25 @@ class DatabaseManager:
             params=(id_periodo, estado_actual[0], cerrado_por, motivo),
             commit=True)
             
-    def insertar_nomina(self, data):
-        query = """
-        INSERT INTO nominas (
-            id_empleado, id_periodo, salario_bruto, deducciones, 
-            salario_neto, total_dias, salario_base, dias_trabajados,
-            dias_descanso, bono_asistencia, seguro_social, rpe,
-            ley_pol_hab, deduccion_inasistencias, cantidad_inasistencias,
-            prestamos_deducidos, total_asignaciones, procesada_por
-        ) VALUES (
-            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-        )
-        """
+    QUERY_INSERTAR_NOMINA = """
+    INSERT INTO nominas (
+        id_empleado, id_periodo, salario_bruto, deducciones, 
+        salario_neto, total_dias, salario_base, dias_trabajados,
+        dias_descanso, bono_asistencia, seguro_social, rpe,
+        ley_pol_hab, deduccion_inasistencias, cantidad_inasistencias,
+        prestamos_deducidos, total_asignaciones, procesada_por
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+    """
+
+    def _valores_nomina(self, data):
+        """Parámetros del INSERT de nominas a partir de los datos de la nómina"""
         total_dias = data['dias_trabajados'] + data['dias_descanso']
         total_deducciones = (data['seguro_social'] + data['rpe'] + data['ley_pol_hab'] + 
                             data['valor_inasistencias'] + data['prestamos'])
         
-        valores = (
+        return (
             data['id_empleado'], data['id_periodo'], data['salario_base'], 
             total_deducciones, data['total_pagar'], total_dias, data['salario_base'],
             data['dias_trabajados'], data['dias_descanso'], data['bonificaciones'],
@@ -680,8 +823,108 @@ class DatabaseManager:
             data['valor_inasistencias'], data['num_inasistencias'],
             data['prestamos'], data['total_asignaciones'], data['procesada_por']
         )
-        
-        return self.ejecutar_query(query, params=valores, commit=True)
+
+    def insertar_nomina(self, data):
+        return self.ejecutar_query(self.QUERY_INSERTAR_NOMINA, params=self._valores_nomina(data), commit=True)
+
+    def procesar_cierre_periodo(self, id_periodo, nominas, pagos_prestamos, fecha_pago, cerrado_por, motivo):
+        """
+        Cierre de período en una sola transacción: inserta todas las nóminas,
+        registra los pagos de préstamos, actualiza sus saldos y cierra el período.
+        Si algo falla no se guarda nada
+        """
+        connection = self.connect()
+        if not connection:
+            raise ValueError("No se pudo conectar a la base de datos")
+
+        try:
+            cursor = connection.cursor()
+            connection.start_transaction()
+
+            # Bloquear el período para evitar cierres simultáneos
+            cursor.execute(
+                "SELECT estado FROM periodos_nomina WHERE id_periodo = %s FOR UPDATE",
+                (id_periodo,))
+            estado_actual = cursor.fetchone()
+
+            if not estado_actual:
+                raise ValueError("El período no existe.")
+            if estado_actual[0] == 'cerrado':
+                raise ValueError("El período ya está cerrado.")
+
+            # Insertar todas las nóminas en lote
+            if nominas:
+                cursor.executemany(self.QUERY_INSERTAR_NOMINA,
+                                   [self._valores_nomina(data) for data in nominas])
+
+            # Préstamos activos de todos los empleados con descuento
+            empleados_pago = {pago['id_empleado'] for pago in pagos_prestamos}
+            if empleados_pago:
+                marcadores = ', '.join(['%s'] * len(empleados_pago))
+                cursor.execute(f"""
+                SELECT p.id_prestamo, p.id_empleado, p.saldo_restante, p.monto_cuota
+                FROM prestamos p
+                WHERE p.id_empleado IN ({marcadores})
+                AND p.estado IN ('aprobado', 'activo')
+                ORDER BY p.id_empleado, p.fecha_solicitud ASC
+                FOR UPDATE
+                """, tuple(empleados_pago))
+                prestamos = cursor.fetchall()
+
+                sin_prestamos = empleados_pago - {prestamo[1] for prestamo in prestamos}
+                if sin_prestamos:
+                    raise ValueError(
+                        "No se encontraron préstamos activos para los empleados: "
+                        + ", ".join(str(id_empleado) for id_empleado in sorted(sin_prestamos)))
+
+                # Se descuenta la cuota exacta de cada préstamo activo
+                fecha_formateada = datetime.strptime(fecha_pago, '%d-%m-%Y').strftime('%Y-%m-%d')
+                pagos = []
+                for id_prestamo, _, saldo_restante, monto_cuota in prestamos:
+                    monto_pago = Decimal(str(monto_cuota))
+                    nuevo_saldo = Decimal(str(saldo_restante)) - monto_pago
+                    pagos.append((id_prestamo, fecha_formateada, monto_pago, nuevo_saldo))
+
+                cursor.executemany("""
+                INSERT INTO prestamos_pagos 
+                (id_prestamo, fecha_pago, monto_pagado, saldo_restante)
+                VALUES (%s, %s, %s, %s)
+                """, pagos)
+
+                # Actualizar todos los préstamos en una sola sentencia
+                # (el estado se asigna primero porque usa el saldo anterior)
+                marcadores = ', '.join(['%s'] * len(prestamos))
+                cursor.execute(f"""
+                UPDATE prestamos
+                SET estado = IF(saldo_restante - monto_cuota <= 0, 'liquidado', 'activo'),
+                    saldo_restante = saldo_restante - monto_cuota,
+                    cuotas_pagadas = cuotas_pagadas + 1
+                WHERE id_prestamo IN ({marcadores})
+                """, tuple(prestamo[0] for prestamo in prestamos))
+
+            # Cerrar el período y registrar el cambio en el historial
+            cursor.execute("""
+            UPDATE periodos_nomina 
+            SET estado = 'cerrado', fecha_cierre = NOW(), cerrado_por = %s
+            WHERE id_periodo = %s
+            """, (cerrado_por, id_periodo))
+
+            cursor.execute("""
+            INSERT INTO historial_periodos 
+            (id_periodo, estado_anterior, estado_nuevo, usuario_id, motivo)
+            VALUES (%s, %s, 'cerrado', %s, %s)
+            """, (id_periodo, estado_actual[0], cerrado_por, motivo))
+
+            connection.commit()
+
+        except Exception as e:
+            if connection:
+                connection.rollback()
+            raise Exception(f"Error al cerrar el período: {str(e)}")
+        finally:
+            if connection and connection.is_connected():
+                cursor.close()
+                connection.close()
 
     def obtener_historial_periodo(self, id_periodo):
 
@@ -1142,6 +1385,17 @@ class DatabaseManager:
         result = self.ejecutar_query(query, (id_empleado,), fetchone=True)
         return Decimal(str(result[0])) if result and result[0] else Decimal('0')
 
+    def obtener_prestamos_monto_nomina_empleados(self):
+        """Obtener el monto de préstamos activos de todos los empleados: {id_empleado: monto}"""
+        query = """
+        SELECT id_empleado, SUM(monto_cuota) as total_cuotas
+        FROM prestamos
+        WHERE estado IN ('aprobado', 'activo')
+        GROUP BY id_empleado
+        """
+        result = self.ejecutar_query(query)
+        return {id_empleado: Decimal(str(total)) for id_empleado, total in result or [] if total}
+
     def obtener_todos_prestamos(self):
         """Obtener todos los préstamos"""
         query = """
@@ -1343,11 +1597,9 @@ class DatabaseManager:
                 connection.close()
 
     def registrar_auditoria(self, usuario, rol, accion, tabla, detalle):
-        query = """
-        INSERT INTO auditoria (usuario, rol, accion, tabla, detalle)
-        VALUES (%s, %s, %s, %s, %s)
-        """
-        self.ejecutar_query(query, (usuario, rol, accion, tabla, detalle), commit=True)
+        """Encolar el registro de auditoría; se escribe por lotes en segundo plano"""
+        obtener_escritor_auditoria(self.pool, **AUDITORIA_CONFIG).registrar(
+            usuario, rol, accion, tabla, detalle)
 
     def verificar_permiso(self, id_usuario: int, codigo_permiso: str, objeto_id: int = None) -> str:
         """
@@ -1414,3 +1666,12 @@ class DatabaseManager:
         
         result = self.ejecutar_query(query, (id_usuario, objeto_id), fetchone=True)
         return result[0] > 0 if result else False
+
+
+def _a_fecha(valor):
+    """Fecha como date, aceptando también el texto 'YYYY-MM-DD'"""
+    if isinstance(valor, str):
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    if isinstance(valor, datetime):
+        return valor.date()
+    return valor
@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+
+@dataclass
+class PrenominaEmpleado:
+    """Resultado del cálculo de prenómina de un empleado"""
+    id_empleado: int
+    nombre: str
+    apellido: str
+    cedula: str
+    cargo: str
+    salario_mensual: Decimal
+    salario_base: Decimal
+    dias_trabajados: int
+    dias_descanso: int
+    bonificaciones: Decimal
+    seguro_social: Decimal
+    rpe: Decimal
+    ley_pol_hab: Decimal
+    otras_deducciones: Decimal
+    num_inasistencias: int
+    valor_inasistencias: Decimal
+    prestamos: Decimal
+    total_deducciones: Decimal
+    total_a_pagar: Decimal
+
+    def como_fila(self):
+        """Fila con el orden de columnas de la prenómina"""
+        return (
+            self.nombre, self.apellido, self.cedula, self.cargo, self.salario_base,
+            self.dias_trabajados, self.dias_descanso, self.bonificaciones,
+            self.seguro_social, self.rpe, self.ley_pol_hab, self.num_inasistencias,
+            self.prestamos, self.total_deducciones, self.total_a_pagar
+        )
+
+
+def calcular_dias_periodo(fecha_inicio, fecha_fin):
+    """Calcula los días trabajados y de descanso en el período"""
+    dias_totales = (fecha_fin - fecha_inicio).days + 1
+    dias_descanso = 0
+
+    # Calcular días de descanso (sábados y domingos)
+    fecha_actual = fecha_inicio
+    while fecha_actual <= fecha_fin:
+        if fecha_actual.weekday() >= 5:  # 5=Sábado, 6=Domingo
+            dias_descanso += 1
+        fecha_actual += timedelta(days=1)
+
+    dias_trabajados = dias_totales - dias_descanso
+    return dias_trabajados, dias_descanso
+
+
+def calcular_salario_base_periodo(salario_mensual, tipo_periodo):
+    """Calcula el salario base según el tipo de período"""
+    salario_mensual = Decimal(str(salario_mensual))
+
+    if tipo_periodo == "Quincenal":
+        return salario_mensual / Decimal('2')
+    elif tipo_periodo == "Mensual":
+        return salario_mensual
+    elif tipo_periodo == "Semanal":
+        return (salario_mensual * Decimal('12')) / Decimal('52')
+    else:
+        raise ValueError(f"Tipo de período no válido: {tipo_periodo}")
+
+
+def calcular_deducciones_periodo(salario_mensual, tipo_periodo, deducciones):
+    """Calcula las deducciones a partir de la configuración de la tabla deducciones"""
+    seguro_social = Decimal('0')
+    rpe = Decimal('0')
+    ley_pol_hab = Decimal('0')
+    otras_deducciones = Decimal('0')
+
+    # Factor de ajuste según período
+    if tipo_periodo == "Quincenal":
+        factor_ss_rpe = Decimal('2')
+        factor_lph = Decimal('2')
+    elif tipo_periodo == "Mensual":
+        factor_ss_rpe = Decimal('4')
+        factor_lph = Decimal('1')
+    elif tipo_periodo == "Semanal":
+        factor_ss_rpe = Decimal('1')
+        factor_lph = Decimal('4')
+
+    for deduccion in deducciones:
+        porcentaje = Decimal(str(deduccion['porcentaje']))
+        nombre = deduccion['nombre'].lower()
+
+        if nombre == "seguro social":
+            base_semanal = (salario_mensual * Decimal('12') / Decimal('52'))
+            seguro_social = base_semanal * porcentaje * factor_ss_rpe
+
+        elif nombre == "rpe":
+            base_semanal = (salario_mensual * Decimal('12') / Decimal('52'))
+            rpe = base_semanal * porcentaje * factor_ss_rpe
+
+        elif nombre == "ley de política habitacional":
+            if tipo_periodo == "Quincenal":
+                salario_base_quincenal = salario_mensual / Decimal('2')
+                factor1 = (salario_base_quincenal / Decimal('30')) * (Decimal('45') / Decimal('12'))
+                ley_pol_hab = (factor1 + salario_base_quincenal) * porcentaje
+            else:
+                base_mensual = salario_mensual
+                if tipo_periodo != "Mensual":
+                    base_mensual = base_mensual / factor_lph
+                ley_pol_hab = base_mensual * porcentaje
+        else:
+            # Manejar otras deducciones configuradas
+            if deduccion['tipo'] == 'porcentaje':
+                otras_deducciones += salario_mensual * porcentaje
+            else:
+                otras_deducciones += porcentaje
+
+    return seguro_social, rpe, ley_pol_hab, otras_deducciones
+
+
+def calcular_valor_inasistencias(salario_mensual, num_inasistencias):
+    """Calcula el valor de las inasistencias (un día equivale a 1/30 del salario mensual)"""
+    valor_dia = salario_mensual / Decimal('30')
+    return valor_dia * Decimal(str(num_inasistencias))
+
+
+def ajustar_prestamos_periodo(monto_prestamo, tipo_periodo):
+    """Ajusta el monto de los préstamos según el tipo de período"""
+    if tipo_periodo == "Quincenal":
+        return monto_prestamo  # El monto base es quincenal
+    elif tipo_periodo == "Mensual":
+        return monto_prestamo * Decimal('2')  # Dos cuotas quincenales
+    elif tipo_periodo == "Semanal":
+        return monto_prestamo / Decimal('2')  # Mitad de la cuota quincenal
+
+    return monto_prestamo
+
+
+def calcular_bonificaciones(salario_base, num_inasistencias, bonificaciones):
+    """Calcula las bonificaciones a partir de la configuración de la tabla bonificaciones"""
+    total_bonificaciones = Decimal('0')
+
+    for bono in bonificaciones:
+        porcentaje = Decimal(str(bono['porcentaje']))
+
+        # Verificar condiciones
+        if bono['condicion'] == 'sin_inasistencias' and num_inasistencias > 0:
+            continue
+
+        if bono['tipo'] == 'porcentaje':
+            total_bonificaciones += salario_base * porcentaje
+        else:
+            total_bonificaciones += porcentaje
+
+    return total_bonificaciones
+
+
+class MotorNomina:
+    """
+    Cálculo de la prenómina de todo el personal para un período.
+    Carga los datos de entrada con un número fijo de consultas y calcula en memoria
+    """
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def cargar_datos(self, fecha_inicio, fecha_fin) -> Dict:
+        """Cargar todos los datos de entrada del período (una consulta por conjunto)"""
+        return {
+            'empleados': self.db_manager.ver_empleados() or [],
+            'deducciones': self.db_manager.obtener_deducciones_configuradas() or [],
+            'bonificaciones': self.db_manager.obtener_bonificaciones_configuradas() or [],
+            'inasistencias': self.db_manager.obtener_inasistencias_periodo(fecha_inicio, fecha_fin),
+            'prestamos': self.db_manager.obtener_prestamos_monto_nomina_empleados()
+        }
+
+    def calcular_periodo(self, tipo_periodo, fecha_inicio, fecha_fin) -> List[PrenominaEmpleado]:
+        """Calcular la prenómina de los empleados activos para el período indicado"""
+        datos = self.cargar_datos(fecha_inicio, fecha_fin)
+
+        # Los días del período son iguales para todos los empleados
+        dias_laborables, dias_descanso = calcular_dias_periodo(fecha_inicio, fecha_fin)
+
+        resultados = []
+        for emp in datos['empleados']:
+            # Saltar empleados inactivos
+            status = emp[7] if len(emp) > 7 and emp[7] else 'activo'
+            if status.lower() == 'inactivo':
+                continue
+
+            resultados.append(self.calcular_empleado(
+                emp, tipo_periodo, dias_laborables, dias_descanso, datos))
+
+        return resultados
+
+    def calcular_empleado(self, emp, tipo_periodo, dias_laborables, dias_descanso, datos):
+        """Calcular la prenómina de un empleado con los datos ya cargados"""
+        id_empleado = emp[0]
+        salario_mensual = Decimal(str(emp[5]))
+        salario_base = calcular_salario_base_periodo(salario_mensual, tipo_periodo)
+
+        num_inasistencias = datos['inasistencias'].get(id_empleado, 0)
+        bonificaciones = calcular_bonificaciones(
+            salario_base, num_inasistencias, datos['bonificaciones'])
+
+        valor_inasistencias = calcular_valor_inasistencias(salario_mensual, num_inasistencias)
+
+        seguro_social, rpe, ley_pol_hab, otras_deducciones = calcular_deducciones_periodo(
+            salario_mensual, tipo_periodo, datos['deducciones'])
+
+        prestamos = ajustar_prestamos_periodo(
+            datos['prestamos'].get(id_empleado, Decimal('0')), tipo_periodo)
+
+        total_deducciones = (seguro_social + rpe + ley_pol_hab +
+                             valor_inasistencias + prestamos)
+        total_a_pagar = salario_base + bonificaciones - total_deducciones
+
+        return PrenominaEmpleado(
+            id_empleado=id_empleado,
+            nombre=emp[1],
+            apellido=emp[2],
+            cedula=emp[3],
+            cargo=emp[4],
+            salario_mensual=salario_mensual,
+            salario_base=salario_base,
+            dias_trabajados=dias_laborables - num_inasistencias,
+            dias_descanso=dias_descanso,
+            bonificaciones=bonificaciones,
+            seguro_social=seguro_social,
+            rpe=rpe,
+            ley_pol_hab=ley_pol_hab,
+            otras_deducciones=otras_deducciones,
+            num_inasistencias=num_inasistencias,
+            valor_inasistencias=valor_inasistencias,
+            prestamos=prestamos,
+            total_deducciones=total_deducciones,
+            total_a_pagar=total_a_pagar
+        )
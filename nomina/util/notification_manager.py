@@ -3,6 +3,96 @@ from typing import List, Dict, Optional
 from util.db_manager import DatabaseManager
 from util.config import DB_CONFIG
 
+# Usuarios activos que reciben las notificaciones de un tipo de permiso (%s = 'codigo%')
+USUARIOS_A_NOTIFICAR = """
+SELECT u.id_usuario
+FROM usuarios u
+WHERE u.estado = 'activo'
+AND (
+    u.rol IN ('admin', 'gerente')
+    OR EXISTS (
+        SELECT 1 FROM usuario_permisos up
+        JOIN permisos_sistema ps ON up.id_permiso = ps.id_permiso
+        WHERE up.id_usuario = u.id_usuario
+        AND ps.codigo LIKE %s
+    )
+)
+"""
+
+# Si la notificación ya existe (misma clave única), no se inserta de nuevo
+SIN_DUPLICADOS = "ON DUPLICATE KEY UPDATE id_notificacion = notificaciones.id_notificacion"
+
+# Períodos abiertos que vencen en 3 días o menos
+NOTIFICAR_PERIODOS = f"""
+INSERT INTO notificaciones (id_usuario, tipo, mensaje, entidad_id, entidad_tipo)
+SELECT u.id_usuario, 'periodo',
+    CONCAT('El período ', p.tipo, ' vence en ', DATEDIFF(p.fecha_fin, CURDATE()), ' días'),
+    p.id_periodo, 'periodo'
+FROM periodos_nomina p
+CROSS JOIN ({USUARIOS_A_NOTIFICAR}) u
+WHERE p.estado = 'abierto'
+AND DATEDIFF(p.fecha_fin, CURDATE()) BETWEEN 0 AND 3
+{SIN_DUPLICADOS}
+"""
+
+# Préstamos liquidados: se notifican una sola vez
+NOTIFICAR_PRESTAMOS = f"""
+INSERT INTO notificaciones (id_usuario, tipo, mensaje, entidad_id, entidad_tipo)
+SELECT u.id_usuario, 'prestamo',
+    CONCAT('El préstamo del empleado ', e.nombre, ' ', e.apellido, ' ha sido liquidado'),
+    p.id_prestamo, 'prestamo'
+FROM prestamos p
+JOIN empleados e ON p.id_empleado = e.id_empleado
+CROSS JOIN ({USUARIOS_A_NOTIFICAR}) u
+WHERE p.estado = 'liquidado'
+AND NOT EXISTS (
+    SELECT 1 FROM notificaciones n
+    WHERE n.entidad_id = p.id_prestamo
+    AND n.tipo = 'prestamo'
+    AND n.estado IN ('leida', 'no_leida')
+)
+{SIN_DUPLICADOS}
+"""
+
+# Empleados activos sin asistencia ni justificativo hoy, después de las 8:30 AM,
+# si hoy es laborable según el calendario laboral
+NOTIFICAR_INASISTENCIAS = f"""
+INSERT INTO notificaciones (id_usuario, tipo, mensaje, entidad_id, entidad_tipo)
+SELECT u.id_usuario, 'inasistencia',
+    CONCAT('El empleado ', e.nombre, ' ', e.apellido, ' registra 1 inasistencias'),
+    e.id_empleado, 'empleado'
+FROM empleados e
+CROSS JOIN ({USUARIOS_A_NOTIFICAR}) u
+WHERE e.status = 'activo'
+AND NOT EXISTS (
+    SELECT 1
+    FROM asistencias a
+    WHERE a.id_empleado = e.id_empleado
+    AND a.fecha = CURDATE()
+)
+AND NOT EXISTS (
+    SELECT 1
+    FROM justificativos j
+    WHERE j.id_empleado = e.id_empleado
+    AND j.fecha = CURDATE()
+)
+AND EXISTS (
+    SELECT 1
+    FROM calendario_laboral c
+    WHERE c.fecha = CURDATE()
+    AND c.laborable = 1
+)
+AND TIME(NOW()) > '08:30:00'
+{SIN_DUPLICADOS}
+"""
+
+# (tipo, consulta, permiso de los usuarios a notificar)
+GENERADORES_NOTIFICACIONES = [
+    ('periodo', NOTIFICAR_PERIODOS, 'periodos'),
+    ('prestamo', NOTIFICAR_PRESTAMOS, 'prestamos'),
+    ('inasistencia', NOTIFICAR_INASISTENCIAS, 'asistencias'),
+]
+
 class NotificationManager:
     def __init__(self, db_manager):
         self.db_manager = db_manager
@@ -28,19 +118,42 @@ class NotificationManager:
             print(f"Error al obtener notificaciones: {e}")
             return []
 
-    def contar_notificaciones_no_leidas(self, id_usuario: int) -> int:
-        """Contar el número de notificaciones no leídas para un usuario"""
+    def obtener_notificaciones_nuevas(self, id_usuario: int, desde_id: int = 0) -> List[Dict]:
+        """Obtener las notificaciones de un usuario con id mayor a 'desde_id', de la más antigua a la más nueva"""
         query = """
-        SELECT COUNT(*) as count 
+        SELECT id_notificacion, tipo, mensaje, fecha_generacion, estado, 
+               entidad_id, entidad_tipo
         FROM notificaciones 
-        WHERE id_usuario = %s AND estado = 'no_leida'
+        WHERE id_usuario = %s AND id_notificacion > %s
+        ORDER BY id_notificacion
+        """
+        try:
+            notificaciones = self.db_manager.ejecutar_query(query, (id_usuario, desde_id), dictionary=True)
+            return notificaciones if notificaciones else []
+        except Exception as e:
+            print(f"Error al obtener notificaciones nuevas: {e}")
+            return []
+
+    def obtener_estado_notificaciones(self, id_usuario: int) -> Dict:
+        """
+        Obtener las notificaciones no leídas y el id de la última notificación de un usuario.
+        Se leen del contador mantenido por triggers (migración 002), sin recorrer notificaciones
+        """
+        query = """
+        SELECT no_leidas, ultima_id
+        FROM notificaciones_contador
+        WHERE id_usuario = %s
         """
         try:
-            result = self.db_manager.ejecutar_query(query, (id_usuario,), fetchone=True)
-            return result[0] if result else 0
+            result = self.db_manager.ejecutar_query(query, (id_usuario,), fetchone=True, dictionary=True)
+            return result if result else {'no_leidas': 0, 'ultima_id': 0}
         except Exception as e:
-            print(f"Error al contar notificaciones: {e}")
-            return 0
+            print(f"Error al obtener el estado de las notificaciones: {e}")
+            return {'no_leidas': 0, 'ultima_id': 0}
+
+    def contar_notificaciones_no_leidas(self, id_usuario: int) -> int:
+        """Contar el número de notificaciones no leídas para un usuario"""
+        return self.obtener_estado_notificaciones(id_usuario)['no_leidas']
 
     def marcar_como_leida(self, id_notificacion: int) -> bool:
         """Marcar una notificación específica como leída"""
@@ -90,49 +203,6 @@ class NotificationManager:
             print(f"Error al crear notificación: {e}")
             return False
 
-    def verificar_periodos_por_vencer(self) -> List[Dict]:
-        """Verificar períodos que están próximos a vencer (3 días o menos)"""
-        query = """
-        SELECT p.id_periodo, p.fecha_fin, p.tipo,
-            DATEDIFF(p.fecha_fin, CURDATE()) as dias_restantes
-        FROM periodos_nomina p
-        WHERE p.estado = 'abierto' 
-        AND DATEDIFF(p.fecha_fin, CURDATE()) BETWEEN 0 AND 3
-        AND NOT EXISTS (
-            SELECT 1 FROM notificaciones n 
-            WHERE n.entidad_id = p.id_periodo 
-            AND n.tipo = 'periodo'
-            AND n.estado IN ('leida', 'no_leida')
-            AND DATE(n.fecha_generacion) = CURDATE()
-        )
-        """
-        try:
-            return self.db_manager.ejecutar_query(query, dictionary=True)
-        except Exception as e:
-            print(f"Error al verificar períodos: {e}")
-            return []
-
-    def verificar_prestamos_liquidados(self) -> List[Dict]:
-        """Verificar préstamos liquidados sin notificación previa"""
-        query = """
-        SELECT p.id_prestamo, p.id_empleado, 
-            CONCAT(e.nombre, ' ', e.apellido) as empleado
-        FROM prestamos p
-        JOIN empleados e ON p.id_empleado = e.id_empleado
-        WHERE p.estado = 'liquidado'
-        AND NOT EXISTS (
-            SELECT 1 FROM notificaciones n 
-            WHERE n.entidad_id = p.id_prestamo 
-            AND n.tipo = 'prestamo'
-            AND n.estado IN ('leida', 'no_leida')
-        )
-        """
-        try:
-            return self.db_manager.ejecutar_query(query, dictionary=True)
-        except Exception as e:
-            print(f"Error al verificar préstamos liquidados: {e}")
-            return []
-        
     def notificar_cambio_estado_prestamo(self, prestamo_id: int, nuevo_estado: str, 
                                     empleado_nombre: str, motivo: str = None):
         """Notificar al empleado sobre cambios en el estado de su préstamo"""
@@ -163,34 +233,6 @@ class NotificationManager:
         except Exception as e:
             print(f"Error al notificar cambio de estado: {e}")
 
-    def verificar_inasistencias(self) -> List[Dict]:
-        """Verificar inasistencias después de las 8:30 AM"""
-        query = """
-        SELECT e.id_empleado, 
-            CONCAT(e.nombre, ' ', e.apellido) as empleado,
-            1 as inasistencias
-        FROM empleados e
-        WHERE e.status = 'activo'
-        AND NOT EXISTS (
-            SELECT 1 
-            FROM asistencias a 
-            WHERE a.id_empleado = e.id_empleado 
-            AND DATE(a.entrada) = CURDATE()
-        )
-        AND NOT EXISTS (
-            SELECT 1
-            FROM justificativos j
-            WHERE j.id_empleado = e.id_empleado
-            AND j.fecha = CURDATE()
-        )
-        AND TIME(NOW()) > '08:30:00'
-        """
-        try:
-            return self.db_manager.ejecutar_query(query, dictionary=True)
-        except Exception as e:
-            print(f"Error al verificar inasistencias: {e}")
-            return []
-
     def eliminar_notificaciones_antiguas(self, dias: int = 30) -> bool:
         """Eliminar notificaciones más antiguas que el número de días especificado"""
         query = """
@@ -207,20 +249,7 @@ class NotificationManager:
         
     def obtener_usuarios_para_notificar(self, tipo_permiso: str) -> List[Dict]:
         """Obtener lista de usuarios que deben recibir notificaciones según el tipo"""
-        query = """
-        SELECT DISTINCT u.id_usuario
-        FROM usuarios u
-        WHERE u.estado = 'activo'
-        AND (
-            u.rol IN ('admin', 'gerente')
-            OR EXISTS (
-                SELECT 1 FROM usuario_permisos up
-                JOIN permisos_sistema ps ON up.id_permiso = ps.id_permiso
-                WHERE up.id_usuario = u.id_usuario
-                AND ps.codigo LIKE %s
-            )
-        )
-        """
+        query = f"SELECT DISTINCT id_usuario FROM ({USUARIOS_A_NOTIFICAR}) u"
         try:
             return self.db_manager.ejecutar_query(query, (f"{tipo_permiso}%",))
         except Exception as e:
@@ -229,99 +258,29 @@ class NotificationManager:
 
     def verificar_y_crear_notificaciones(self, trigger_user_id: int = None):
         """
-        Verificar y crear notificaciones para todos los usuarios correspondientes
+        Verificar y crear notificaciones para todos los usuarios correspondientes.
+        Cada tipo se genera con un solo INSERT ... SELECT; los duplicados del mismo
+        usuario, tipo, entidad y día los descarta la clave única uk_notificacion_dia
         Args:
             trigger_user_id: ID del usuario que triggereó la verificación (opcional)
         """
-        # Verificar períodos por vencer
-        periodos = self.verificar_periodos_por_vencer()
-        if periodos:
-            usuarios = self.obtener_usuarios_para_notificar('periodos')
-            for periodo in periodos:
-                for usuario in usuarios:
-                    id_usuario = usuario[0]
-                    # Verificar si ya existe notificación
-                    query = """
-                    SELECT 1 FROM notificaciones 
-                    WHERE entidad_id = %s 
-                    AND tipo = 'periodo'
-                    AND id_usuario = %s
-                    AND estado IN ('leida', 'no_leida')
-                    AND DATE(fecha_generacion) = CURDATE()
-                    """
-                    existe = self.db_manager.ejecutar_query(query, 
-                        (periodo['id_periodo'], id_usuario), 
-                        fetchone=True
-                    )
-                    
-                    if not existe:
-                        mensaje = f"El período {periodo['tipo']} vence en {periodo['dias_restantes']} días"
-                        self.crear_notificacion(
-                            id_usuario, 
-                            'periodo', 
-                            mensaje,
-                            periodo['id_periodo'],
-                            'periodo'
-                        )
-
-        # Verificar préstamos liquidados
-        prestamos = self.verificar_prestamos_liquidados()
-        if prestamos:
-            usuarios = self.obtener_usuarios_para_notificar('prestamos')
-            for prestamo in prestamos:
-                for usuario in usuarios:
-                    id_usuario = usuario[0]
-                    # Verificar si ya existe notificación
-                    query = """
-                    SELECT 1 FROM notificaciones 
-                    WHERE entidad_id = %s 
-                    AND tipo = 'prestamo'
-                    AND id_usuario = %s
-                    AND estado IN ('leida', 'no_leida')
-                    AND DATE(fecha_generacion) = CURDATE()
-                    """
-                    existe = self.db_manager.ejecutar_query(query,
-                        (prestamo['id_prestamo'], id_usuario),
-                        fetchone=True
-                    )
-                    
-                    if not existe:
-                        mensaje = f"El préstamo del empleado {prestamo['empleado']} ha sido liquidado"
-                        self.crear_notificacion(
-                            id_usuario,
-                            'prestamo',
-                            mensaje,
-                            prestamo['id_prestamo'],
-                            'prestamo'
-                        )
+        connection = self.db_manager.connect()
+        if not connection:
+            return False
 
-        # Verificar inasistencias
-        inasistencias = self.verificar_inasistencias()
-        if inasistencias:
-            usuarios = self.obtener_usuarios_para_notificar('asistencias')
-            for inasistencia in inasistencias:
-                for usuario in usuarios:
-                    id_usuario = usuario[0]
-                    # Verificar si ya existe notificación
-                    query = """
-                    SELECT 1 FROM notificaciones 
-                    WHERE entidad_id = %s 
-                    AND tipo = 'inasistencia'
-                    AND id_usuario = %s
-                    AND estado IN ('leida', 'no_leida')
-                    AND DATE(fecha_generacion) = CURDATE()
-                    """
-                    existe = self.db_manager.ejecutar_query(query,
-                        (inasistencia['id_empleado'], id_usuario),
-                        fetchone=True
-                    )
-                    
-                    if not existe:
-                        mensaje = f"El empleado {inasistencia['empleado']} registra {inasistencia['inasistencias']} inasistencias"
-                        self.crear_notificacion(
-                            id_usuario,
-                            'inasistencia',
-                            mensaje,
-                            inasistencia['id_empleado'],
-                            'empleado'
-                        )
\ No newline at end of file
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            for tipo, query, permiso in GENERADORES_NOTIFICACIONES:
+                cursor.execute(query, (f"{permiso}%",))
+                print(f"Notificaciones de tipo {tipo} generadas: {cursor.rowcount}")
+            connection.commit()
+            return True
+        except Exception as e:
+            connection.rollback()
+            print(f"Error al generar notificaciones: {e}")
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            connection.close()
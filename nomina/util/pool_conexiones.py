@@ -0,0 +1,208 @@
+import threading
+import time
+import mysql.connector
+from mysql.connector import Error
+
+
+class ConexionPool:
+    """
+    Envoltorio de una conexión prestada por el pool.
+    Se comporta como la conexión de mysql.connector, pero close() la devuelve al pool
+    """
+    def __init__(self, pool, conexion):
+        self._pool = pool
+        self._conexion = conexion
+        self._devuelta = False
+
+    def __getattr__(self, nombre):
+        return getattr(self.__dict__['_conexion'], nombre)
+
+    def close(self):
+        """Devolver la conexión al pool en lugar de cerrarla"""
+        if not self._devuelta:
+            self._devuelta = True
+            self._pool.liberar(self._conexion)
+
+    def __del__(self):
+        # Red de seguridad: si el llamador no cerró la conexión (p. ej. porque
+        # is_connected() devolvió False) el espacio del pool no se pierde
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones MySQL con tamaño configurable, verificación de salud,
+    cierre de conexiones ociosas y métricas de espera
+    """
+    def __init__(self, host, database, user, password, tamaño=5, espera_maxima=10,
+                 max_inactividad=300, intervalo_verificacion=30):
+        self.config = {
+            'host': host,
+            'database': database,
+            'user': user,
+            'password': password,
+            # Descartar resultados no leídos al reutilizar la conexión
+            'consume_results': True
+        }
+        self.tamaño = tamaño
+        self.espera_maxima = espera_maxima
+        self.max_inactividad = max_inactividad
+        self.intervalo_verificacion = intervalo_verificacion
+
+        self._condicion = threading.Condition()
+        self._libres = []  # Lista de (conexion, ultimo_uso)
+        self._prestadas = 0
+
+        # Métricas
+        self._solicitudes = 0
+        self._esperas = 0
+        self._tiempo_espera_total = 0.0
+        self._tiempo_espera_max = 0.0
+        self._agotamientos = 0
+        self._creadas = 0
+        self._descartadas = 0
+
+    def _crear_conexion(self):
+        conexion = mysql.connector.connect(**self.config)
+        self._creadas += 1
+        print(f"Conectado exitosamente a la base de datos: {self.config['database']}")
+        return conexion
+
+    def _cerrar(self, conexion):
+        self._descartadas += 1
+        try:
+            conexion.close()
+        except Error:
+            pass
+
+    def _desalojar_ociosas(self, ahora):
+        """Cerrar las conexiones libres que superan el tiempo máximo de inactividad"""
+        vigentes = []
+        for conexion, ultimo_uso in self._libres:
+            if ahora - ultimo_uso > self.max_inactividad:
+                self._cerrar(conexion)
+            else:
+                vigentes.append((conexion, ultimo_uso))
+        self._libres = vigentes
+
+    def _esta_sana(self, conexion, ultimo_uso, ahora):
+        """Verificar la conexión solo si lleva tiempo sin usarse"""
+        if ahora - ultimo_uso < self.intervalo_verificacion:
+            return True
+        try:
+            conexion.ping(reconnect=False)
+            return True
+        except Error:
+            return False
+
+    def obtener(self):
+        """Obtener una conexión del pool, esperando si todas están en uso"""
+        inicio = time.monotonic()
+        with self._condicion:
+            self._solicitudes += 1
+            esperó = False
+            while True:
+                ahora = time.monotonic()
+                self._desalojar_ociosas(ahora)
+
+                while self._libres:
+                    conexion, ultimo_uso = self._libres.pop()
+                    if self._esta_sana(conexion, ultimo_uso, ahora):
+                        self._prestadas += 1
+                        self._registrar_espera(inicio, esperó)
+                        return ConexionPool(self, conexion)
+                    self._cerrar(conexion)
+
+                if self._prestadas < self.tamaño:
+                    # Reservar el espacio antes de conectar fuera del candado
+                    self._prestadas += 1
+                    break
+
+                restante = self.espera_maxima - (ahora - inicio)
+                if restante <= 0:
+                    self._agotamientos += 1
+                    self._registrar_espera(inicio, True)
+                    raise Error(msg="Tiempo de espera agotado: no hay conexiones disponibles en el pool")
+                esperó = True
+                self._condicion.wait(restante)
+
+        try:
+            conexion = self._crear_conexion()
+        except Exception:
+            with self._condicion:
+                self._prestadas -= 1
+                self._condicion.notify()
+            raise
+
+        with self._condicion:
+            self._registrar_espera(inicio, esperó)
+        return ConexionPool(self, conexion)
+
+    def _registrar_espera(self, inicio, esperó):
+        espera = time.monotonic() - inicio
+        if esperó:
+            self._esperas += 1
+        self._tiempo_espera_total += espera
+        self._tiempo_espera_max = max(self._tiempo_espera_max, espera)
+
+    def liberar(self, conexion):
+        """Devolver una conexión al pool dejando la sesión limpia"""
+        reutilizable = False
+        try:
+            if conexion.is_connected():
+                # Cerrar transacciones abiertas (incluidas las de solo lectura)
+                # para que el siguiente uso no vea una instantánea antigua
+                if conexion.in_transaction:
+                    conexion.rollback()
+                reutilizable = True
+        except Error:
+            reutilizable = False
+
+        with self._condicion:
+            self._prestadas -= 1
+            if reutilizable:
+                self._libres.append((conexion, time.monotonic()))
+            else:
+                self._cerrar(conexion)
+            self._condicion.notify()
+
+    def cerrar_todas(self):
+        """Cerrar todas las conexiones libres del pool"""
+        with self._condicion:
+            for conexion, _ in self._libres:
+                self._cerrar(conexion)
+            self._libres = []
+
+    def estadisticas(self):
+        """Métricas de uso y espera del pool"""
+        with self._condicion:
+            return {
+                'tamaño': self.tamaño,
+                'en_uso': self._prestadas,
+                'libres': len(self._libres),
+                'solicitudes': self._solicitudes,
+                'esperas': self._esperas,
+                'espera_promedio': (self._tiempo_espera_total / self._solicitudes
+                                    if self._solicitudes else 0.0),
+                'espera_maxima': self._tiempo_espera_max,
+                'agotamientos': self._agotamientos,
+                'conexiones_creadas': self._creadas,
+                'conexiones_descartadas': self._descartadas
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def obtener_pool(host, database, user, password, **opciones):
+    """Obtener (o crear) el pool compartido para una configuración de base de datos"""
+    clave = (host, database, user)
+    with _pools_lock:
+        pool = _pools.get(clave)
+        if pool is None:
+            pool = PoolConexiones(host, database, user, password, **opciones)
+            _pools[clave] = pool
+        return pool
@@ -0,0 +1,166 @@
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+import mysql.connector
+from mysql.connector import Error
+
+
+class ExpresionCron:
+    """
+    Expresión tipo cron de 5 campos: minuto hora día-del-mes mes día-de-la-semana.
+    Admite '*', listas (1,15), rangos (1-5) y pasos (*/5, 0-30/10).
+    El día de la semana va de 0 (domingo) a 6 (sábado)
+    """
+    LIMITES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expresion):
+        campos = expresion.split()
+        if len(campos) != 5:
+            raise ValueError(f"Expresión cron no válida: {expresion}")
+        self.expresion = expresion
+        self.minutos, self.horas, self.dias, self.meses, self.dias_semana = [
+            self._interpretar(campo, minimo, maximo)
+            for campo, (minimo, maximo) in zip(campos, self.LIMITES)
+        ]
+        self._todos_dias = campos[2] == '*'
+        self._todos_dias_semana = campos[4] == '*'
+
+    def _interpretar(self, campo, minimo, maximo):
+        valores = set()
+        for parte in campo.split(','):
+            rango, _, paso = parte.partition('/')
+            paso = int(paso) if paso else 1
+            if rango == '*':
+                inicio, fin = minimo, maximo
+            elif '-' in rango:
+                inicio, fin = (int(v) for v in rango.split('-'))
+            else:
+                inicio = fin = int(rango)
+                if paso > 1:
+                    fin = maximo
+            if inicio < minimo or fin > maximo or inicio > fin or paso < 1:
+                raise ValueError(f"Campo cron fuera de rango: {campo}")
+            valores.update(range(inicio, fin + 1, paso))
+        return valores
+
+    def _dia_valido(self, momento):
+        dia_semana = (momento.weekday() + 1) % 7  # Python: lunes=0; cron: domingo=0
+        coincide_dia = momento.day in self.dias
+        coincide_dia_semana = dia_semana in self.dias_semana
+        # Como en cron: si se restringen ambos campos de día basta con que se cumpla uno
+        if self._todos_dias or self._todos_dias_semana:
+            return coincide_dia and coincide_dia_semana
+        return coincide_dia or coincide_dia_semana
+
+    def coincide(self, momento):
+        """Indica si la expresión se cumple en el minuto de 'momento'"""
+        return (momento.minute in self.minutos and momento.hour in self.horas
+                and momento.month in self.meses and self._dia_valido(momento))
+
+    def siguiente(self, desde):
+        """Próximo minuto, posterior a 'desde', en que se cumple la expresión"""
+        momento = desde.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limite = momento + timedelta(days=366 * 5)
+        while momento < limite:
+            if momento.month not in self.meses:
+                momento = (momento.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._dia_valido(momento):
+                momento = momento.replace(hour=0, minute=0) + timedelta(days=1)
+            elif momento.hour not in self.horas:
+                momento = momento.replace(minute=0) + timedelta(hours=1)
+            elif momento.minute not in self.minutos:
+                momento += timedelta(minutes=1)
+            else:
+                return momento
+        raise ValueError(f"La expresión cron nunca se cumple: {self.expresion}")
+
+
+class Programador:
+    """
+    Ejecuta tareas según expresiones cron en un proceso sin interfaz.
+    Un bloqueo con nombre de MySQL (GET_LOCK) garantiza que solo una instancia
+    ejecute las tareas aunque el programador se inicie en varios equipos
+    """
+    def __init__(self, db_config, nombre_bloqueo):
+        self.db_config = db_config
+        self.nombre_bloqueo = nombre_bloqueo
+        self.tareas = []  # [ExpresionCron, nombre, función, próxima ejecución]
+        self._conexion_bloqueo = None
+        self._detener = threading.Event()
+
+    def agregar_tarea(self, nombre, expresion, funcion, al_iniciar=False):
+        """Registrar una tarea; con al_iniciar también se ejecuta al arrancar el programador"""
+        cron = ExpresionCron(expresion)
+        ahora = datetime.now()
+        self.tareas.append([cron, nombre, funcion, ahora if al_iniciar else cron.siguiente(ahora)])
+
+    def adquirir_bloqueo(self):
+        """Tomar el bloqueo de instancia única; devuelve False si otra instancia lo tiene"""
+        try:
+            if self._conexion_bloqueo is None or not self._conexion_bloqueo.is_connected():
+                self._conexion_bloqueo = mysql.connector.connect(**self.db_config)
+            cursor = self._conexion_bloqueo.cursor()
+            # El bloqueo vive mientras esta conexión siga abierta
+            cursor.execute("SELECT IS_USED_LOCK(%s) = CONNECTION_ID()", (self.nombre_bloqueo,))
+            if cursor.fetchone()[0] == 1:
+                cursor.close()
+                return True
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (self.nombre_bloqueo,))
+            obtenido = cursor.fetchone()[0] == 1
+            cursor.close()
+            return obtenido
+        except Error as e:
+            print(f"Error al obtener el bloqueo del programador: {e}")
+            self._conexion_bloqueo = None
+            return False
+
+    def liberar_bloqueo(self):
+        try:
+            if self._conexion_bloqueo and self._conexion_bloqueo.is_connected():
+                cursor = self._conexion_bloqueo.cursor()
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (self.nombre_bloqueo,))
+                cursor.fetchone()
+                cursor.close()
+                self._conexion_bloqueo.close()
+        except Error:
+            pass
+        self._conexion_bloqueo = None
+
+    def detener(self, *args):
+        self._detener.set()
+
+    def ejecutar(self):
+        """Bucle principal: espera la próxima tarea y la ejecuta si se tiene el bloqueo"""
+        signal.signal(signal.SIGINT, self.detener)
+        signal.signal(signal.SIGTERM, self.detener)
+
+        try:
+            while not self._detener.is_set():
+                proxima = min(tarea[3] for tarea in self.tareas)
+                espera = (proxima - datetime.now()).total_seconds()
+                if espera > 0 and self._detener.wait(espera):
+                    break
+
+                ahora = datetime.now()
+                pendientes = [tarea for tarea in self.tareas if tarea[3] <= ahora]
+
+                # Si otra instancia tiene el bloqueo, esta solo espera a su turno
+                if pendientes and self.adquirir_bloqueo():
+                    for tarea in pendientes:
+                        self._ejecutar_tarea(tarea)
+
+                for tarea in pendientes:
+                    tarea[3] = tarea[0].siguiente(ahora)
+        finally:
+            self.liberar_bloqueo()
+
+    def _ejecutar_tarea(self, tarea):
+        _, nombre, funcion, _ = tarea
+        inicio = time.perf_counter()
+        try:
+            funcion()
+            print(f"{datetime.now():%d-%m-%Y %H:%M:%S} Tarea '{nombre}' completada "
+                  f"en {time.perf_counter() - inicio:.2f} s")
+        except Exception as e:
+            print(f"{datetime.now():%d-%m-%Y %H:%M:%S} Error en la tarea '{nombre}': {e}")
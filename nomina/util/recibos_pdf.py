@@ -0,0 +1,331 @@
+import io
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from PIL import Image as PILImage
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from util.motor_nomina import calcular_dias_periodo
+
+
+LOGO_RECIBO = "./imagenes/Logo RHG.jpg"
+ANCHO_LOGO = 1.2*inch
+RESOLUCION_LOGO = 150  # Puntos por pulgada con los que se incrusta el logo
+
+
+class PlantillaRecibo:
+    """
+    Partes estáticas del recibo de pago: logo, encabezado y estilos.
+    Se construyen una sola vez por proceso y el encabezado se dibuja
+    en cada recibo como un formulario (XObject) de PDF
+    """
+    NOMBRE_FORMULARIO = 'EncabezadoRecibo'
+
+    def __init__(self, logo_path=LOGO_RECIBO):
+        self.styles = getSampleStyleSheet()
+        self.encabezado = None
+        self.alto_encabezado = 0
+
+        try:
+            logo = Image(self._reducir_logo(logo_path), width=ANCHO_LOGO,
+                         height=ANCHO_LOGO * self._aspecto, lazy=0)
+
+            header_style = ParagraphStyle(
+                'HeaderStyle',
+                parent=self.styles['Normal'],
+                fontSize=12,
+                alignment=1
+            )
+
+            header_data = [
+                [logo, Paragraph("<b>R.H.G. INVERSIONES, C.A.</b>", header_style)],
+                ['', Paragraph("<b>RIF. J-31347671-9</b>", header_style)],
+                ['', Paragraph("<b>COMPROBANTE DE PAGO</b>", header_style)]
+            ]
+
+            header_table = Table(header_data, colWidths=[1.5*inch, 5*inch])
+            header_table.setStyle(TableStyle([
+                ('ALIGN', (0,0), (0,-1), 'LEFT'),
+                ('ALIGN', (1,0), (1,-1), 'CENTER'),
+                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+                ('SPAN', (0,0), (0,2))
+            ]))
+
+            # El tamaño del encabezado no cambia: se calcula una sola vez
+            _, self.alto_encabezado = header_table.wrap(*letter)
+            self.encabezado = header_table
+
+        except Exception as e:
+            print(f"Error al cargar el logo: {e}")
+
+    def _reducir_logo(self, logo_path):
+        """Decodificar el logo y reducirlo a la resolución con la que se imprime"""
+        with PILImage.open(logo_path) as img:
+            self._aspecto = img.height / float(img.width)
+            ancho_px = int(ANCHO_LOGO / inch * RESOLUCION_LOGO)
+            if img.width > ancho_px:
+                img = img.resize((ancho_px, max(1, int(ancho_px * self._aspecto))), PILImage.LANCZOS)
+            buffer = io.BytesIO()
+            img.convert('RGB').save(buffer, format='JPEG', quality=85, optimize=True)
+        buffer.seek(0)
+        return buffer
+
+    def elementos_encabezado(self):
+        """Espacio que ocupa el encabezado en el flujo del documento"""
+        if not self.encabezado:
+            return []
+        return [Spacer(1, self.alto_encabezado), Spacer(1, 0.3 * inch)]
+
+    def dibujar_encabezado(self, canvas, doc):
+        """Dibujar el encabezado en la primera página como formulario reutilizable"""
+        if not self.encabezado:
+            return
+        canvas.saveState()
+        canvas.beginForm(self.NOMBRE_FORMULARIO)
+        # Misma posición que tendría la tabla como primer elemento del marco
+        x = doc.leftMargin + (doc.width - self.encabezado._width) / 2
+        y = doc.pagesize[1] - doc.topMargin - 6 - self.alto_encabezado
+        self.encabezado.drawOn(canvas, x, y)
+        canvas.endForm()
+        canvas.doForm(self.NOMBRE_FORMULARIO)
+        canvas.restoreState()
+
+
+_plantilla = None
+
+def obtener_plantilla():
+    """Plantilla del recibo compartida por todos los recibos del proceso"""
+    global _plantilla
+    if _plantilla is None:
+        _plantilla = PlantillaRecibo()
+    return _plantilla
+
+
+def generar_recibo_pdf(filename, data):
+    """Genera un PDF de nómina con cálculos precisos."""
+    doc = SimpleDocTemplate(filename, pagesize=letter, 
+                            topMargin=0.5*inch, bottomMargin=0.5*inch)
+    plantilla = obtener_plantilla()
+    styles = plantilla.styles
+    elements = plantilla.elementos_encabezado()
+
+    # Calcular días trabajados usando la función existente
+    fecha_inicio = datetime.strptime(data['periodo_info'][2], '%d-%m-%Y').date()
+    fecha_fin = datetime.strptime(data['periodo_info'][3], '%d-%m-%Y').date()
+    dias_laborables, dias_descanso = calcular_dias_periodo(fecha_inicio, fecha_fin)
+
+    # Bloque de información del período
+    periodo_info = [
+        [f"Período:", f"{data['periodo_info'][1].upper()}"],
+        [f"Del:", f"{data['periodo_info'][2]} al {data['periodo_info'][3]}"]
+    ]
+    t_periodo = Table(periodo_info, colWidths=[1*inch, 2*inch, 0.7*inch, 2.5*inch])
+    t_periodo.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ]))
+    elements.append(t_periodo)
+    elements.append(Spacer(1, 0.2 * inch))
+
+    # Bloque de datos del trabajador
+    sueldo_mensual = data['sueldo'] * 2
+
+    trabajador_info = [
+        [f"Apellidos y Nombres:", f"{data['apellido']} {data['nombre']}"],
+        [f"Cédula:", f"{data['cedula']}"],
+        [f"Salario Mensual:", f"Bs. {sueldo_mensual:,.2f}"],
+        [f"Cargo:", f"{data['cargo']}"]
+    ]
+    t_trabajador = Table(trabajador_info, colWidths=[2.5 * inch, 3.5 * inch])
+    t_trabajador.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+        ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ]))
+    elements.append(t_trabajador)
+    elements.append(Spacer(1, 0.2 * inch))
+
+    # Tabla de asignaciones con días trabajados
+    valor_dia = data['sueldo'] / 15
+    total_dias_trabajados = valor_dia * dias_laborables
+    total_dias_descanso = valor_dia * dias_descanso
+    total_asignaciones1 = (total_dias_trabajados + total_dias_descanso + data['bonificaciones'])
+
+    asignaciones_data = [
+        ["ASIGNACIONES", "Valor", "Días/Porc.", "Monto"],
+        ["Días Trabajados", f"Bs. {valor_dia:,.2f}", f"{dias_laborables}", f"Bs. {total_dias_trabajados:,.2f}"],
+        ["Días de Descanso", f"Bs. {valor_dia:,.2f}", f"{dias_descanso}", f"Bs. {total_dias_descanso:,.2f}"],
+        ["Bono por Asistencia", "-", "5%", f"Bs. {data['bonificaciones']:,.2f}"]
+    ]
+
+    # Configuración de la tabla de asignaciones
+    t_conceptos = Table(asignaciones_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    t_conceptos.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('ALIGN', (0, 1), (0, -1), 'LEFT'),  # Alinear nombres a la izquierda
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+
+    # Calcular el valor por día
+    valor_dia = data['sueldo'] / 15  # Para quincena dividimos entre 15 días
+    monto_inasistencias = valor_dia * data['inasistencias']
+
+
+    # Tabla de conceptos - Deducciones
+    deducciones_data = [
+        ["DEDUCCIONES", "Base", "Porc.", "Monto"],
+        ["S.S.O.", f"Bs. {data['sueldo']:,.2f}", "4%", f"Bs. {data['seguro_social']:,.2f}"],
+        ["R.P.E.", f"Bs. {data['sueldo']:,.2f}", "0.5%", f"Bs. {data['rpe']:,.2f}"],
+        ["F.A.O.V.", f"Bs. {data['sueldo']:,.2f}", "1%", f"Bs. {data['ley_pol_hab']:,.2f}"],
+    ]
+
+    # Agregar inasistencias y préstamos si existen
+    if data['inasistencias'] > 0:
+        deducciones_data.append([
+            "Inasistencias", 
+            f"Bs. {valor_dia:,.2f}",
+            f"{data['inasistencias']} día(s)",
+            f"Bs. {monto_inasistencias:,.2f}"
+        ])
+    if data['prestamos'] > 0:
+        deducciones_data.append(["Préstamos", "", "", f"Bs. {data['prestamos']:,.2f}"])
+
+    # Calcular totales
+    total_asignaciones = data['sueldo'] + data['bonificaciones']
+    total_deducciones = (data['seguro_social'] + data['rpe'] + 
+                        data['ley_pol_hab'] + monto_inasistencias + 
+                        data['prestamos'])
+    neto_a_cobrar = total_asignaciones - total_deducciones
+
+    # Totales
+    totales_data = [
+        ["TOTALES", "", "", ""],
+        ["Total Asignaciones", "", f"Bs. {total_asignaciones:,.2f}", ""],
+        ["Total Deducciones", "", "", f"Bs. {total_deducciones:,.2f}"],
+        ["NETO A COBRAR", "", f"Bs. {neto_a_cobrar:,.2f}", ""]
+    ]
+
+    # Combinar todas las tablas
+    all_data = []
+    all_data.extend(asignaciones_data)
+    all_data.append(["", "", "", ""])  # Espacio entre secciones
+    all_data.extend(deducciones_data)
+    all_data.append(["", "", "", ""])  # Espacio entre secciones
+    all_data.extend(totales_data)
+
+    t_conceptos = Table(all_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+    t_conceptos.setStyle(TableStyle([
+        # Estilo para encabezados de sección
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#B8CCE4')),
+        ('BACKGROUND', (0, len(asignaciones_data) + 1), (-1, len(asignaciones_data) + 1), colors.HexColor('#F2DCDB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('TEXTCOLOR', (0, len(asignaciones_data) + 1), (-1, len(asignaciones_data) + 1), colors.black),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTNAME', (0, len(asignaciones_data) + 1), (-1, len(asignaciones_data) + 1), 'Helvetica-Bold'),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+        # Estilo para totales
+        ('FONTNAME', (0, -4), (-1, -1), 'Helvetica-Bold'),
+        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#E2EFD9')),
+    ]))
+    elements.append(t_conceptos)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    # Pie de firma
+    elements.append(Paragraph(
+        "Declaro haber recibido conforme el monto que me corresponde para el "
+        "período según los conceptos especificados en este recibo de pago.",
+        styles['Normal']
+    ))
+    elements.append(Spacer(1, 0.5 * inch))
+
+    # Tabla de firma
+    firma_data = [
+        ["_____________________", "_____________________", "_____________________"],
+        ["Firma del Empleado", "Cédula", "Fecha"],
+    ]
+    t_firma = Table(firma_data, colWidths=[2*inch, 2*inch, 2*inch])
+    t_firma.setStyle(TableStyle([
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 1), (-1, 1), 'Helvetica'),
+        ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ]))
+    elements.append(t_firma)
+
+    doc.build(elements, onFirstPage=plantilla.dibujar_encabezado)
+
+
+def _generar_recibo(trabajo):
+    """Tarea del proceso trabajador: generar un recibo y devolver el resultado"""
+    try:
+        generar_recibo_pdf(trabajo['archivo'], trabajo['datos'])
+        return trabajo['cedula'], None
+    except Exception as e:
+        return trabajo['cedula'], str(e)
+
+
+class GeneradorRecibos:
+    """
+    Generación de los recibos de pago en paralelo con un pool de procesos.
+    Cada trabajo es un diccionario con datos planos (cedula, archivo, datos).
+    El avance se publica en una cola que la interfaz consulta con after()
+    """
+    def __init__(self, trabajos, procesos=None):
+        self.trabajos = list(trabajos)
+        self.procesos = procesos or os.cpu_count() or 1
+        self.eventos = queue.Queue()
+        self.generados = 0
+        self.fallidos = {}  # cédula -> mensaje de error
+        self._hilo = None
+
+    def iniciar(self):
+        """Lanzar la generación en segundo plano"""
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+
+    def _ejecutar(self):
+        total = len(self.trabajos)
+        completados = set()
+        try:
+            procesos = max(1, min(self.procesos, total))
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                futuros = {pool.submit(_generar_recibo, trabajo): trabajo['cedula']
+                           for trabajo in self.trabajos}
+                for futuro in as_completed(futuros):
+                    try:
+                        cedula, error = futuro.result()
+                    except Exception as e:
+                        # El proceso trabajador terminó de forma inesperada
+                        cedula, error = futuros[futuro], str(e)
+
+                    completados.add(cedula)
+                    if error:
+                        self.fallidos[cedula] = error
+                        print(f"Error generando recibo de {cedula}: {error}")
+                    else:
+                        self.generados += 1
+                    self.eventos.put(('avance', len(completados), total))
+        except Exception as e:
+            # El pool no pudo iniciarse: los recibos pendientes quedan como fallidos
+            print(f"Error en la generación de recibos: {e}")
+            for trabajo in self.trabajos:
+                if trabajo['cedula'] not in completados:
+                    self.fallidos[trabajo['cedula']] = str(e)
+
+        self.eventos.put(('fin', self.generados, self.fallidos))
@@ -0,0 +1,909 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from datetime import datetime
+import mysql.connector
+from mysql.connector import Error
+
+# Tamaño de los bloques que se leen y escriben al comprimir, descomprimir y calcular sumas
+TAMAÑO_BLOQUE = 1024 * 1024
+MANIFIESTO = 'manifiesto.json'
+ESQUEMA = 'esquema.json'
+
+# Tipos de columna que se guardan en base64; el resto se guarda como texto
+TIPOS_BINARIOS = ('binary', 'varbinary', 'tinyblob', 'blob', 'mediumblob', 'longblob', 'bit')
+
+
+class RespaldoCancelado(Exception):
+    """El usuario canceló el respaldo o la restauración"""
+
+
+class _Progreso:
+    """
+    Avance de una operación, compartido por los hilos del motor paralelo.
+    avance(hecho, total, unidad) se llama al sumar; total puede ser None si no se conoce
+    """
+    def __init__(self, avance=None, cancelar=None, total=None, unidad='filas'):
+        self.avance = avance
+        self.cancelar = cancelar
+        self.total = total
+        self.unidad = unidad
+        self.hecho = 0
+        self._candado = threading.Lock()
+        self._interrumpido = threading.Event()
+
+    def sumar(self, cantidad):
+        with self._candado:
+            self.hecho += cantidad
+            if self.avance:
+                self.avance(self.hecho, self.total, self.unidad)
+
+    def interrumpir(self):
+        """Detener a los demás hilos en su próximo lote (otra tabla falló)"""
+        self._interrumpido.set()
+
+    def verificar(self):
+        if self.cancelar is not None and self.cancelar.is_set():
+            raise RespaldoCancelado("Operación cancelada por el usuario")
+        if self._interrumpido.is_set():
+            raise RespaldoCancelado("Operación interrumpida por un error en otra tabla")
+
+
+class _ArchivoConSuma:
+    """Archivo de escritura que calcula el SHA-256 de lo que se escribe en él"""
+    def __init__(self, archivo):
+        self.archivo = archivo
+        self.suma = hashlib.sha256()
+        self.tamaño = 0
+
+    def write(self, datos):
+        self.suma.update(datos)
+        self.tamaño += len(datos)
+        return self.archivo.write(datos)
+
+    def flush(self):
+        self.archivo.flush()
+
+
+class GestorRespaldos:
+    """
+    Respaldos comprimidos de la base de datos, registrados en un manifiesto con su SHA-256.
+
+    Motor 'paralelo': cada tabla se vuelca en su propio archivo desde varias conexiones
+    que comparten la misma instantánea, y se restaura en paralelo con INSERT de varias filas.
+    Está escrito en Python y no necesita los programas de MySQL.
+    Motor 'mysqldump': un único .sql.gz generado con mysqldump y restaurado con mysql.
+    La restauración reconoce el formato de cada respaldo
+    """
+    def __init__(self, db_config, directorio, mysqldump=None, mysql=None, motor='paralelo', hilos=4,
+                 filas_por_lote=1000, filas_por_consulta=10000, bytes_por_lote=4 * 1024 * 1024,
+                 max_incrementales=6, retencion=None):
+        self.db_config = db_config
+        self.directorio = directorio
+        # Sin ruta configurada se buscan en el PATH; solo hacen falta para el motor mysqldump
+        # y para restaurar respaldos .sql
+        self.mysqldump = mysqldump or shutil.which('mysqldump')
+        self.mysql = mysql or shutil.which('mysql')
+        self.motor = motor
+        self.hilos = hilos
+        self.filas_por_lote = filas_por_lote
+        self.filas_por_consulta = filas_por_consulta
+        self.bytes_por_lote = bytes_por_lote
+        self.max_incrementales = max_incrementales
+        # Abuelo-padre-hijo: cuántos días, semanas y meses conservan su último respaldo
+        self.retencion = retencion
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _conectar(self, base=None):
+        """Conexión a la base de datos configurada o a otra base del mismo servidor"""
+        return mysql.connector.connect(**dict(self.db_config, database=base or self.db_config['database']))
+
+    def _comando(self, programa, *opciones, base=None):
+        """Línea de comandos de mysqldump o mysql ('programa') y su entorno"""
+        ruta = getattr(self, programa)
+        if not ruta:
+            raise Exception(f"No se encontró {programa}: instálelo o configure su ruta en RESPALDOS_CONFIG")
+        comando = [
+            ruta,
+            f'--host={self.db_config["host"]}',
+            f'--user={self.db_config["user"]}',
+            *opciones,
+            base or self.db_config["database"]
+        ]
+        # La contraseña va en el entorno para que no aparezca en la lista de procesos
+        entorno = dict(os.environ, MYSQL_PWD=self.db_config["password"])
+        return comando, entorno
+
+    def leer_manifiesto(self):
+        ruta = os.path.join(self.directorio, MANIFIESTO)
+        if not os.path.exists(ruta):
+            return {'respaldos': []}
+        with open(ruta, encoding='utf-8') as archivo:
+            return json.load(archivo)
+
+    def listar_respaldos(self):
+        """
+        Catálogo de respaldos, del más reciente al más antiguo, leído solo del manifiesto.
+        La primera vez se incorporan los .sql que ya estaban en la carpeta
+        """
+        manifiesto = self.leer_manifiesto()
+        if not manifiesto.get('catalogo'):
+            self._incorporar_existentes(manifiesto)
+        return sorted(manifiesto['respaldos'], key=lambda r: r['fecha'], reverse=True)
+
+    def _incorporar_existentes(self, manifiesto):
+        registrados = {respaldo['archivo'] for respaldo in manifiesto['respaldos']}
+        for archivo in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, archivo)
+            if archivo in registrados or not archivo.endswith(('.sql', '.sql.gz')) or not os.path.isfile(ruta):
+                continue
+            stats = os.stat(ruta)
+            manifiesto['respaldos'].append({
+                'archivo': archivo,
+                'fecha': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                'tamaño': stats.st_size,
+                'sha256': self.calcular_suma(ruta),
+                'formato': 'mysqldump'
+            })
+        manifiesto['catalogo'] = True
+        self._guardar_manifiesto(manifiesto)
+
+    def _guardar_manifiesto(self, manifiesto):
+        ruta = os.path.join(self.directorio, MANIFIESTO)
+        temporal = ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(manifiesto, archivo, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+
+    def buscar_en_manifiesto(self, nombre):
+        for respaldo in self.leer_manifiesto()['respaldos']:
+            if respaldo['archivo'] == nombre:
+                return respaldo
+        return None
+
+    def _registrar(self, respaldo):
+        manifiesto = self.leer_manifiesto()
+        if not manifiesto.get('catalogo'):
+            self._incorporar_existentes(manifiesto)
+        manifiesto['respaldos'].append(respaldo)
+        self._guardar_manifiesto(manifiesto)
+        if self.retencion:
+            self.aplicar_retencion()
+
+    def _seleccionar_conservados(self, respaldos):
+        """Nombres de los respaldos que conserva la política abuelo-padre-hijo"""
+        ordenados = sorted(respaldos, key=lambda r: r['fecha'], reverse=True)
+        conservados = {ordenados[0]['archivo']} if ordenados else set()
+
+        # El respaldo más reciente de cada uno de los últimos N días, semanas y meses
+        periodos = [
+            ('diarios', lambda fecha: fecha.date()),
+            ('semanales', lambda fecha: fecha.isocalendar()[:2]),
+            ('mensuales', lambda fecha: (fecha.year, fecha.month)),
+        ]
+        for clave, periodo_de in periodos:
+            vistos = []
+            for respaldo in ordenados:
+                periodo = periodo_de(datetime.strptime(respaldo['fecha'], '%Y-%m-%d %H:%M:%S'))
+                if periodo in vistos:
+                    continue
+                if len(vistos) >= self.retencion.get(clave, 0):
+                    break
+                vistos.append(periodo)
+                conservados.add(respaldo['archivo'])
+
+        # Un incremental necesita los respaldos anteriores que tienen los datos de sus tablas,
+        # y esos a su vez los suyos: se agregan hasta que no aparezcan nuevos
+        por_nombre = {respaldo['archivo']: respaldo for respaldo in respaldos}
+        pendientes = list(conservados)
+        while pendientes:
+            nombre = pendientes.pop()
+            for tabla in por_nombre.get(nombre, {}).get('tablas', {}).values():
+                origen = tabla.get('origen', nombre)
+                if origen not in conservados:
+                    conservados.add(origen)
+                    pendientes.append(origen)
+        return conservados
+
+    def aplicar_retencion(self):
+        """Borrar los respaldos que la política de retención ya no conserva"""
+        manifiesto = self.leer_manifiesto()
+        conservados = self._seleccionar_conservados(manifiesto['respaldos'])
+        eliminados = [r['archivo'] for r in manifiesto['respaldos'] if r['archivo'] not in conservados]
+        if not eliminados:
+            return []
+
+        manifiesto['respaldos'] = [r for r in manifiesto['respaldos'] if r['archivo'] in conservados]
+        self._guardar_manifiesto(manifiesto)
+        for nombre in eliminados:
+            ruta = os.path.join(self.directorio, nombre)
+            try:
+                if os.path.isdir(ruta):
+                    shutil.rmtree(ruta)
+                elif os.path.exists(ruta):
+                    os.remove(ruta)
+            except OSError as e:
+                print(f"Error al eliminar el respaldo {nombre}: {e}")
+        print(f"Retención de respaldos: {len(eliminados)} eliminados")
+        return eliminados
+
+    def crear_respaldo(self, incremental=False, avance=None, cancelar=None):
+        """
+        Generar un respaldo con el motor configurado y registrarlo en el manifiesto.
+        incremental: solo se vuelcan las tablas que cambiaron desde el respaldo anterior
+        (solo con el motor paralelo).
+        avance(hecho, total, unidad) informa el progreso; cancelar es un threading.Event
+        """
+        if self.motor == 'mysqldump':
+            if incremental:
+                raise Exception("El motor mysqldump no admite respaldos incrementales")
+            return self._crear_respaldo_mysqldump(_Progreso(avance, cancelar, unidad='bytes'))
+        return self._crear_respaldo_paralelo(incremental, _Progreso(avance, cancelar))
+
+    def restaurar_respaldo(self, ruta, avance=None, cancelar=None):
+        """Restaurar un respaldo: carpeta por tablas, .sql.gz o .sql"""
+        if os.path.isdir(ruta):
+            return self._restaurar_paralelo(ruta, _Progreso(avance, cancelar))
+        return self._restaurar_mysql(ruta, _Progreso(avance, cancelar, unidad='bytes'))
+
+    def _crear_respaldo_mysqldump(self, progreso):
+        inicio = time.perf_counter()
+        nombre = f"backup_{datetime.now().strftime('%d%m%Y_%H%M%S')}.sql.gz"
+        ruta = os.path.join(self.directorio, nombre)
+        parcial = ruta + '.parcial'
+
+        # --single-transaction: instantánea consistente de InnoDB sin bloquear las tablas
+        comando, entorno = self._comando('mysqldump', '--single-transaction', '--quick',
+                                         '--routines', '--triggers')
+        tamaño_original = 0
+        proceso = None
+        try:
+            with tempfile.TemporaryFile() as errores, open(parcial, 'wb') as destino:
+                archivo = _ArchivoConSuma(destino)
+                proceso = subprocess.Popen(comando, stdout=subprocess.PIPE, stderr=errores, env=entorno)
+                with gzip.GzipFile(filename=nombre[:-3], mode='wb', fileobj=archivo, mtime=0) as comprimido:
+                    while True:
+                        bloque = proceso.stdout.read(TAMAÑO_BLOQUE)
+                        if not bloque:
+                            break
+                        tamaño_original += len(bloque)
+                        comprimido.write(bloque)
+                        progreso.sumar(len(bloque))
+                        progreso.verificar()
+                proceso.stdout.close()
+                if proceso.wait() != 0:
+                    errores.seek(0)
+                    raise Exception(errores.read().decode('utf-8', 'replace').strip())
+            os.replace(parcial, ruta)
+        except Exception:
+            if proceso and proceso.poll() is None:
+                proceso.kill()
+                proceso.wait()
+            if os.path.exists(parcial):
+                os.remove(parcial)
+            raise
+
+        respaldo = {
+            'archivo': nombre,
+            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'tamaño': archivo.tamaño,
+            'tamaño_original': tamaño_original,
+            'sha256': archivo.suma.hexdigest(),
+            'duracion': round(time.perf_counter() - inicio, 2),
+            'formato': 'mysqldump'
+        }
+        self._registrar(respaldo)
+        return respaldo
+
+    def calcular_suma(self, ruta):
+        suma = hashlib.sha256()
+        with open(ruta, 'rb') as archivo:
+            for bloque in iter(lambda: archivo.read(TAMAÑO_BLOQUE), b''):
+                suma.update(bloque)
+        return suma.hexdigest()
+
+    def verificar_suma(self, ruta):
+        """Comparar el SHA-256 del archivo con el del manifiesto (los respaldos antiguos no tienen)"""
+        respaldo = self.buscar_en_manifiesto(os.path.basename(ruta))
+        if respaldo is None:
+            return None
+        return self.calcular_suma(ruta) == respaldo['sha256']
+
+    def _restaurar_mysql(self, ruta, progreso, base=None):
+        """Restaurar un .sql.gz o .sql enviándolo por bloques a mysql"""
+        if self.verificar_suma(ruta) is False:
+            raise Exception("La suma de verificación no coincide: el respaldo está dañado")
+
+        # El avance se mide en bytes leídos del archivo (comprimido o no)
+        progreso.total = os.path.getsize(ruta)
+        comando, entorno = self._comando('mysql', base=base)
+        with tempfile.TemporaryFile() as errores, open(ruta, 'rb') as archivo:
+            origen = gzip.GzipFile(fileobj=archivo, mode='rb') if ruta.endswith('.gz') else archivo
+            proceso = subprocess.Popen(comando, stdin=subprocess.PIPE, stderr=errores, env=entorno)
+            try:
+                leido = 0
+                for bloque in iter(lambda: origen.read(TAMAÑO_BLOQUE), b''):
+                    proceso.stdin.write(bloque)
+                    progreso.sumar(archivo.tell() - leido)
+                    leido = archivo.tell()
+                    progreso.verificar()
+                proceso.stdin.close()
+            except BrokenPipeError:
+                # mysql terminó antes de tiempo; el motivo queda en errores
+                pass
+            except RespaldoCancelado:
+                proceso.kill()
+                proceso.wait()
+                raise
+            if proceso.wait() != 0:
+                errores.seek(0)
+                raise Exception(errores.read().decode('utf-8', 'replace').strip())
+
+    # ------------------------------------------------------------------
+    # Motor paralelo por tablas
+    # ------------------------------------------------------------------
+
+    def _leer_tablas(self, conexion):
+        """Tablas base con sus columnas (sin las calculadas), de la más grande a la más pequeña"""
+        cursor = conexion.cursor()
+        cursor.execute("""
+            SELECT c.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE
+            FROM information_schema.COLUMNS c
+            JOIN information_schema.TABLES t
+              ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+            WHERE c.TABLE_SCHEMA = DATABASE()
+            AND t.TABLE_TYPE = 'BASE TABLE'
+            AND c.EXTRA NOT IN ('VIRTUAL GENERATED', 'STORED GENERATED')
+            ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+        """)
+        tablas = {}
+        for tabla, columna, tipo in cursor.fetchall():
+            info = tablas.setdefault(tabla, {'nombre': tabla, 'columnas': [], 'binarias': []})
+            info['columnas'].append(columna)
+            if tipo.lower() in TIPOS_BINARIOS:
+                info['binarias'].append(columna)
+
+        cursor.execute("""
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND CONSTRAINT_NAME = 'PRIMARY'
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """)
+        claves = {}
+        for tabla, columna in cursor.fetchall():
+            claves.setdefault(tabla, []).append(columna)
+        for tabla, clave in claves.items():
+            # Una clave con columnas calculadas no sirve: esas columnas no se leen
+            if tabla in tablas and all(columna in tablas[tabla]['columnas'] for columna in clave):
+                tablas[tabla]['clave'] = clave
+
+        cursor.execute("""
+            SELECT TABLE_NAME, COALESCE(DATA_LENGTH, 0), COALESCE(TABLE_ROWS, 0)
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+        """)
+        tamaños = {}
+        for tabla, tamaño, filas in cursor.fetchall():
+            tamaños[tabla] = tamaño
+            if tabla in tablas:
+                # Estimación de InnoDB, solo para mostrar el avance
+                tablas[tabla]['filas_estimadas'] = int(filas)
+        cursor.close()
+        return sorted(tablas.values(), key=lambda t: tamaños.get(t['nombre'], 0), reverse=True)
+
+    def _leer_esquema(self, conexion, tablas):
+        """Sentencias CREATE de tablas, vistas y triggers"""
+        cursor = conexion.cursor()
+        esquema = {'tablas': {}, 'vistas': {}, 'triggers': {}}
+        for tabla in tablas:
+            cursor.execute(f"SHOW CREATE TABLE `{tabla['nombre']}`")
+            esquema['tablas'][tabla['nombre']] = cursor.fetchone()[1]
+
+        cursor.execute("""
+            SELECT TABLE_NAME FROM information_schema.VIEWS WHERE TABLE_SCHEMA = DATABASE()
+        """)
+        for (vista,) in cursor.fetchall():
+            cursor.execute(f"SHOW CREATE VIEW `{vista}`")
+            esquema['vistas'][vista] = cursor.fetchone()[1]
+
+        cursor.execute("""
+            SELECT TRIGGER_NAME FROM information_schema.TRIGGERS WHERE TRIGGER_SCHEMA = DATABASE()
+        """)
+        for (trigger,) in cursor.fetchall():
+            cursor.execute(f"SHOW CREATE TRIGGER `{trigger}`")
+            esquema['triggers'][trigger] = cursor.fetchone()[2]
+        cursor.close()
+        return esquema
+
+    def _abrir_instantanea(self, coordinador, cantidad):
+        """
+        Abrir 'cantidad' conexiones que ven la misma instantánea de la base de datos.
+        Se bloquean las escrituras solo mientras cada conexión inicia su transacción;
+        sin permiso para el bloqueo global se usa una sola conexión
+        """
+        cursor = coordinador.cursor()
+        try:
+            cursor.execute("FLUSH TABLES WITH READ LOCK")
+            bloqueado = True
+        except Error as e:
+            print(f"Sin bloqueo global para la instantánea, se usará una sola conexión: {e}")
+            bloqueado = False
+            cantidad = 1
+
+        conexiones = []
+        try:
+            for _ in range(cantidad):
+                conexion = self._conectar()
+                conexiones.append(conexion)
+                cursor_instantanea = conexion.cursor()
+                cursor_instantanea.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                cursor_instantanea.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+                cursor_instantanea.close()
+        except Exception:
+            for conexion in conexiones:
+                conexion.close()
+            raise
+        finally:
+            if bloqueado:
+                cursor.execute("UNLOCK TABLES")
+            cursor.close()
+        return conexiones
+
+    def _en_paralelo(self, conexiones, tablas, funcion, progreso):
+        """
+        Repartir las tablas entre las conexiones: cada hilo toma la siguiente tabla libre.
+        Devuelve {tabla: resultado} o lanza el primer error; tras un error los demás hilos
+        se detienen en su próximo lote (progreso.verificar)
+        """
+        pendientes = list(tablas)
+        resultados = {}
+        errores = []
+        candado = threading.Lock()
+
+        def trabajar(conexion):
+            while True:
+                with candado:
+                    if not pendientes or errores:
+                        return
+                    tabla = pendientes.pop(0)
+                try:
+                    resultado = funcion(conexion, tabla)
+                    with candado:
+                        resultados[tabla['nombre']] = resultado
+                except RespaldoCancelado as e:
+                    with candado:
+                        errores.append(e)
+                    progreso.interrumpir()
+                    return
+                except Exception as e:
+                    with candado:
+                        errores.append(Exception(f"Tabla {tabla['nombre']}: {e}"))
+                    progreso.interrumpir()
+                    return
+
+        hilos = [threading.Thread(target=trabajar, args=(conexion,), daemon=True)
+                 for conexion in conexiones]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        if errores:
+            raise errores[0]
+        return resultados
+
+    def _suma_tabla(self, conexion, tabla):
+        """
+        Cantidad de filas y suma de verificación del contenido de una tabla, sin importar el orden.
+        Se calcula en el servidor dentro de la instantánea, sin transferir las filas
+        """
+        columnas = ', '.join(f"`{columna}`" for columna in tabla['columnas'])
+        nulos = ', '.join(f"ISNULL(`{columna}`)" for columna in tabla['columnas'])
+        cursor = conexion.cursor()
+        cursor.execute(f"""
+            SELECT COUNT(*), COALESCE(SUM(CRC32(CONCAT_WS('|', {columnas}, CONCAT({nulos})))), 0)
+            FROM `{tabla['nombre']}`
+        """)
+        filas, suma = cursor.fetchone()
+        cursor.close()
+        return int(filas), int(suma)
+
+    def _respaldar_tabla(self, conexion, tabla, carpeta, nombre, padre, progreso):
+        """Volcar la tabla, o reutilizar la del respaldo padre si no cambió"""
+        progreso.verificar()
+        filas, suma = self._suma_tabla(conexion, tabla)
+        previa = padre['tablas'].get(tabla['nombre']) if padre else None
+        if (previa and previa.get('suma') == suma and previa['filas'] == filas
+                and previa['columnas'] == tabla['columnas']):
+            # Sin cambios: se apunta al respaldo que ya tiene los datos
+            progreso.sumar(filas)
+            return dict(previa, origen=previa.get('origen', padre['archivo']))
+
+        resultado = self._volcar_tabla(conexion, tabla, carpeta, progreso)
+        resultado.update(suma=suma, origen=nombre)
+        return resultado
+
+    def _volcar_tabla(self, conexion, tabla, carpeta, progreso):
+        """Escribir las filas de una tabla como lotes JSON (uno por línea) en un archivo gzip"""
+        archivo_tabla = f"{tabla['nombre']}.json.gz"
+        convertir = [_a_base64 if columna in tabla['binarias'] else _a_texto
+                     for columna in tabla['columnas']]
+
+        # raw=True: los valores llegan tal como los envía el servidor, sin convertir a tipos de Python
+        cursor = conexion.cursor(raw=True)
+        filas = 0
+        with open(os.path.join(carpeta, archivo_tabla), 'wb') as destino:
+            archivo = _ArchivoConSuma(destino)
+            with gzip.GzipFile(filename=archivo_tabla[:-3], mode='wb', fileobj=archivo,
+                               mtime=0) as comprimido:
+                for lote in self._leer_lotes(cursor, tabla, convertir):
+                    comprimido.write(json.dumps(lote, ensure_ascii=False).encode('utf-8') + b'\n')
+                    filas += len(lote)
+                    progreso.sumar(len(lote))
+                    progreso.verificar()
+        cursor.close()
+        return {
+            'archivo': archivo_tabla,
+            'columnas': tabla['columnas'],
+            'binarias': tabla['binarias'],
+            'filas': filas,
+            'tamaño': archivo.tamaño,
+            'sha256': archivo.suma.hexdigest()
+        }
+
+    def _leer_lotes(self, cursor, tabla, convertir):
+        """
+        Filas de la tabla, ya convertidas, en lotes de filas_por_lote.
+        Con clave primaria se lee por tramos de la clave (WHERE clave > última ORDER BY clave LIMIT n):
+        cada consulta recorre solo su tramo del índice y la memoria queda acotada.
+        Sin clave primaria se recorre la tabla con una sola consulta
+        """
+        columnas = ', '.join(f"`{columna}`" for columna in tabla['columnas'])
+        clave = tabla.get('clave')
+        if not clave:
+            cursor.execute(f"SELECT {columnas} FROM `{tabla['nombre']}`")
+            while True:
+                lote = cursor.fetchmany(self.filas_por_lote)
+                if not lote:
+                    return
+                yield [_convertir_fila(convertir, fila) for fila in lote]
+
+        orden = ', '.join(f"`{columna}`" for columna in clave)
+        posiciones = [tabla['columnas'].index(columna) for columna in clave]
+        condicion = f"WHERE ({orden}) > ({', '.join(['%s'] * len(clave))}) "
+        ultima = None
+        while True:
+            cursor.execute(f"SELECT {columnas} FROM `{tabla['nombre']}` {condicion if ultima else ''}"
+                           f"ORDER BY {orden} LIMIT {self.filas_por_consulta}", ultima)
+            tramo = [_convertir_fila(convertir, fila) for fila in cursor.fetchall()]
+            for inicio in range(0, len(tramo), self.filas_por_lote):
+                yield tramo[inicio:inicio + self.filas_por_lote]
+            if len(tramo) < self.filas_por_consulta:
+                return
+            # La clave de la última fila, como texto (o bytes si es binaria) para compararla
+            # con la intercalación de la columna
+            ultima = [base64.b64decode(tramo[-1][posicion]) if clave[i] in tabla['binarias']
+                      else tramo[-1][posicion] for i, posicion in enumerate(posiciones)]
+
+    def _padre_incremental(self):
+        """Último respaldo por tablas, si la cadena no superó el máximo de incrementales"""
+        respaldos = [r for r in self.leer_manifiesto()['respaldos'] if r.get('formato') == 'tablas']
+        if not respaldos:
+            return None
+        padre = respaldos[-1]
+        if padre.get('incrementales', 0) >= self.max_incrementales:
+            return None
+        return padre
+
+    def _crear_respaldo_paralelo(self, incremental, progreso):
+        inicio = time.perf_counter()
+        nombre = f"backup_{datetime.now().strftime('%d%m%Y_%H%M%S')}"
+        padre = self._padre_incremental() if incremental else None
+        carpeta = os.path.join(self.directorio, nombre)
+        parcial = carpeta + '.parcial'
+        os.makedirs(parcial)
+
+        coordinador = self._conectar()
+        conexiones = []
+        try:
+            tablas = self._leer_tablas(coordinador)
+            progreso.total = sum(tabla.get('filas_estimadas', 0) for tabla in tablas)
+            conexiones = self._abrir_instantanea(coordinador, min(self.hilos, max(len(tablas), 1)))
+            # El esquema se lee después de la instantánea: sin bloqueo de DDL podría no coincidir
+            # con los datos si alguien altera una tabla durante el respaldo (no es el caso habitual)
+            esquema = self._leer_esquema(coordinador, tablas)
+            resultados = self._en_paralelo(
+                conexiones, tablas,
+                lambda conexion, tabla: self._respaldar_tabla(conexion, tabla, parcial, nombre, padre,
+                                                              progreso),
+                progreso)
+
+            with open(os.path.join(parcial, ESQUEMA), 'w', encoding='utf-8') as archivo:
+                json.dump(esquema, archivo, ensure_ascii=False, indent=2)
+            os.replace(parcial, carpeta)
+        except Exception:
+            for archivo in os.listdir(parcial):
+                os.remove(os.path.join(parcial, archivo))
+            os.rmdir(parcial)
+            raise
+        finally:
+            for conexion in conexiones + [coordinador]:
+                try:
+                    conexion.close()
+                except Error:
+                    pass
+
+        respaldo = {
+            'archivo': nombre,
+            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            # Solo cuenta lo que se escribió en este respaldo
+            'tamaño': sum(tabla['tamaño'] for tabla in resultados.values() if tabla['origen'] == nombre),
+            'sha256_esquema': self.calcular_suma(os.path.join(carpeta, ESQUEMA)),
+            'tablas': resultados,
+            'filas': sum(tabla['filas'] for tabla in resultados.values()),
+            'duracion': round(time.perf_counter() - inicio, 2),
+            'formato': 'tablas',
+            'tipo': 'incremental' if padre else 'completo',
+            'padre': padre['archivo'] if padre else None,
+            'base': (padre.get('base') or padre['archivo']) if padre else nombre,
+            'incrementales': padre.get('incrementales', 0) + 1 if padre else 0
+        }
+        self._registrar(respaldo)
+        return respaldo
+
+    def _archivo_tabla(self, respaldo, info):
+        """Ruta del archivo con los datos de una tabla; en un incremental puede estar en un respaldo anterior"""
+        origen = info.get('origen', respaldo['archivo'])
+        ruta = os.path.join(self.directorio, origen, info['archivo'])
+        if not os.path.exists(ruta):
+            raise Exception(f"Falta el respaldo {origen} de la cadena de respaldos incrementales")
+        return ruta
+
+    def _verificar_carpeta(self, carpeta, respaldo):
+        if self.calcular_suma(os.path.join(carpeta, ESQUEMA)) != respaldo['sha256_esquema']:
+            raise Exception("La suma de verificación del esquema no coincide: el respaldo está dañado")
+        for nombre, tabla in respaldo['tablas'].items():
+            if self.calcular_suma(self._archivo_tabla(respaldo, tabla)) != tabla['sha256']:
+                raise Exception(f"La suma de verificación de la tabla {nombre} no coincide: "
+                                f"el respaldo está dañado")
+
+    def _preparar_carga(self, conexion):
+        cursor = conexion.cursor()
+        # Igual que mysqldump: sin validar claves foráneas ni únicas durante la carga
+        # y sin reasignar los id en 0 de las columnas AUTO_INCREMENT
+        cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0")
+        cursor.execute("SET SESSION UNIQUE_CHECKS = 0")
+        cursor.execute("SET SESSION sql_mode = 'NO_AUTO_VALUE_ON_ZERO'")
+        cursor.close()
+
+    def _bytes_por_insert(self, cursor):
+        """Tamaño máximo de un INSERT: bytes_por_lote, y como mucho la mitad de max_allowed_packet"""
+        cursor.execute("SELECT @@max_allowed_packet")
+        fila = cursor.fetchone()
+        return min(self.bytes_por_lote, int(fila[0]) // 2) if fila else self.bytes_por_lote
+
+    def _cargar_tabla(self, conexion, tabla, respaldo, progreso, maximo_bytes):
+        """
+        Insertar los lotes de un archivo de tabla con INSERT de varias filas (executemany).
+        Un lote con filas grandes se parte para que ningún INSERT supere maximo_bytes
+        """
+        info = tabla['info']
+        columnas = ', '.join(f"`{columna}`" for columna in info['columnas'])
+        marcadores = ', '.join(['%s'] * len(info['columnas']))
+        query = f"INSERT INTO `{tabla['nombre']}` ({columnas}) VALUES ({marcadores})"
+        binarias = [columna in info['binarias'] for columna in info['columnas']]
+
+        cursor = conexion.cursor()
+        filas = 0
+        with gzip.open(self._archivo_tabla(respaldo, info), 'rb') as origen:
+            for linea in origen:
+                lote = json.loads(linea)
+                if any(binarias):
+                    lote = [[base64.b64decode(valor) if binaria and valor is not None else valor
+                             for binaria, valor in zip(binarias, fila)] for fila in lote]
+                for tramo in _dividir_por_tamaño(lote, maximo_bytes):
+                    progreso.verificar()
+                    cursor.executemany(query, tramo)
+                    filas += len(tramo)
+                    progreso.sumar(len(tramo))
+                conexion.commit()
+        cursor.close()
+        return filas
+
+    def _restaurar_paralelo(self, carpeta, progreso, base=None):
+        respaldo = self.buscar_en_manifiesto(os.path.basename(os.path.normpath(carpeta)))
+        if respaldo is None:
+            raise Exception("El respaldo no está registrado en el manifiesto")
+        self._verificar_carpeta(carpeta, respaldo)
+        progreso.total = sum(info['filas'] for info in respaldo['tablas'].values())
+        with open(os.path.join(carpeta, ESQUEMA), encoding='utf-8') as archivo:
+            esquema = json.load(archivo)
+
+        coordinador = self._conectar(base)
+        conexiones = []
+        try:
+            # Recrear las tablas vacías; los triggers y las vistas van después de los datos
+            self._preparar_carga(coordinador)
+            cursor = coordinador.cursor()
+            for vista in esquema['vistas']:
+                cursor.execute(f"DROP VIEW IF EXISTS `{vista}`")
+            for tabla, crear in esquema['tablas'].items():
+                cursor.execute(f"DROP TABLE IF EXISTS `{tabla}`")
+                cursor.execute(crear)
+
+            tablas = sorted(({'nombre': nombre, 'info': info} for nombre, info in respaldo['tablas'].items()),
+                            key=lambda tabla: tabla['info']['tamaño'], reverse=True)
+            maximo_bytes = self._bytes_por_insert(cursor)
+            for _ in range(min(self.hilos, max(len(tablas), 1))):
+                conexion = self._conectar(base)
+                conexiones.append(conexion)
+                self._preparar_carga(conexion)
+            filas = self._en_paralelo(
+                conexiones, tablas,
+                lambda conexion, tabla: self._cargar_tabla(conexion, tabla, respaldo, progreso, maximo_bytes),
+                progreso)
+
+            for crear in esquema['triggers'].values():
+                cursor.execute(crear)
+            for crear in esquema['vistas'].values():
+                if base:
+                    # SHOW CREATE VIEW califica las tablas con el esquema original
+                    crear = crear.replace(f"`{self.db_config['database']}`.", f"`{base}`.")
+                cursor.execute(crear)
+            cursor.close()
+            return sum(filas.values())
+        finally:
+            for conexion in conexiones + [coordinador]:
+                try:
+                    conexion.close()
+                except Error:
+                    pass
+
+    # ------------------------------------------------------------------
+    # Verificación de respaldos
+    # ------------------------------------------------------------------
+
+    def verificar_respaldo(self, ruta, avance=None, cancelar=None):
+        """
+        Restaurar el respaldo en un esquema temporal y comparar cada tabla (filas y suma)
+        con el manifiesto, sin tocar la base de datos en uso.
+        Devuelve un informe con las diferencias, la duración y las filas por segundo;
+        el resultado queda registrado en el catálogo.
+        Los respaldos sin filas ni sumas por tabla (mysqldump) solo se restauran:
+        el informe indica comparado=False y correcto=None
+        """
+        nombre = os.path.basename(os.path.normpath(ruta))
+        respaldo = self.buscar_en_manifiesto(nombre)
+        base = f"{self.db_config['database']}_verificacion_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+
+        administrador = self._conectar()
+        cursor = administrador.cursor()
+        cursor.execute(f"CREATE DATABASE `{base}`")
+        try:
+            inicio = time.perf_counter()
+            if os.path.isdir(ruta):
+                self._restaurar_paralelo(ruta, _Progreso(avance, cancelar), base)
+            else:
+                self._restaurar_mysql(ruta, _Progreso(avance, cancelar, unidad='bytes'), base)
+            duracion = time.perf_counter() - inicio
+
+            tablas, diferencias, comparado = self._comparar_tablas(base, respaldo)
+        finally:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{base}`")
+            cursor.close()
+            administrador.close()
+
+        filas = sum(tabla['filas'] for tabla in tablas.values())
+        informe = {
+            'fecha': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'comparado': comparado,
+            'correcto': not diferencias if comparado else None,
+            'diferencias': diferencias,
+            'tablas': len(tablas),
+            'filas': filas,
+            'duracion': round(duracion, 2),
+            'filas_por_segundo': round(filas / duracion) if duracion > 0 else 0
+        }
+        if respaldo is not None:
+            manifiesto = self.leer_manifiesto()
+            for registrado in manifiesto['respaldos']:
+                if registrado['archivo'] == nombre:
+                    registrado['verificacion'] = informe
+            self._guardar_manifiesto(manifiesto)
+        return informe
+
+    def _comparar_tablas(self, base, respaldo):
+        """
+        Filas y suma de cada tabla restaurada, sus diferencias con el manifiesto
+        y si había algo con qué compararlas
+        """
+        conexion = self._conectar(base)
+        try:
+            tablas = {tabla['nombre']: tabla for tabla in self._leer_tablas(conexion)}
+            esperadas = (respaldo or {}).get('tablas', {})
+            diferencias = [f"Falta la tabla {nombre}" for nombre in esperadas if nombre not in tablas]
+            for nombre, tabla in tablas.items():
+                tabla['filas'], tabla['suma'] = self._suma_tabla(conexion, tabla)
+                esperada = esperadas.get(nombre)
+                if esperada is None:
+                    continue
+                if tabla['filas'] != esperada['filas']:
+                    diferencias.append(f"{nombre}: {tabla['filas']} filas restauradas, "
+                                       f"{esperada['filas']} en el respaldo")
+                elif 'suma' in esperada and tabla['suma'] != esperada['suma']:
+                    diferencias.append(f"{nombre}: el contenido no coincide con la suma del respaldo")
+            return tablas, diferencias, bool(esperadas)
+        finally:
+            conexion.close()
+
+
+def _dividir_por_tamaño(lote, maximo):
+    """Partir un lote en tramos cuyo tamaño aproximado dentro del INSERT no supere 'maximo' bytes"""
+    tramo = []
+    tamaño = 0
+    for fila in lote:
+        # Los binarios pueden duplicarse al escaparlos; NULL y separadores, unos pocos bytes
+        tamaño_fila = sum(4 if valor is None else 2 * len(valor) if isinstance(valor, bytes)
+                          else len(str(valor).encode('utf-8')) + 2 for valor in fila) + 2 * len(fila)
+        if tramo and tamaño + tamaño_fila > maximo:
+            yield tramo
+            tramo = []
+            tamaño = 0
+        tramo.append(fila)
+        tamaño += tamaño_fila
+    if tramo:
+        yield tramo
+
+def _convertir_fila(convertir, fila):
+    return [None if valor is None else conversion(valor) for conversion, valor in zip(convertir, fila)]
+
+def _a_texto(valor):
+    return valor.decode('utf-8')
+
+def _a_base64(valor):
+    return base64.b64encode(valor).decode('ascii')
+
+
+class TareaRespaldo:
+    """
+    Ejecuta un respaldo o una restauración en segundo plano.
+    El avance y el resultado se publican en una cola que la interfaz consulta con after():
+    ('avance', hecho, total, unidad), ('fin', resultado), ('cancelado',) o ('error', mensaje)
+    """
+    def __init__(self, funcion, *args, **kwargs):
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.eventos = queue.Queue()
+        self.cancelacion = threading.Event()
+        self._hilo = None
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+
+    def cancelar(self):
+        self.cancelacion.set()
+
+    def en_curso(self):
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def _ejecutar(self):
+        try:
+            resultado = self.funcion(*self.args, avance=self._avance, cancelar=self.cancelacion, **self.kwargs)
+            self.eventos.put(('fin', resultado))
+        except RespaldoCancelado:
+            self.eventos.put(('cancelado',))
+        except Exception as e:
+            print(f"Error en la tarea de respaldo: {e}")
+            self.eventos.put(('error', str(e)))
+
+    def _avance(self, hecho, total, unidad):
+        self.eventos.put(('avance', hecho, total, unidad))